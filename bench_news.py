@@ -0,0 +1,455 @@
+# --- CORE_INTEL BENCHMARKS ---
+# Drives the headless pipeline in news_core against synthetic RSS served from a local
+# HTTP server and prints one JSON object per measurement:
+#   python bench_news.py --out bench.jsonl
+#   python bench_news.py --compare bench.jsonl    # exit 1 if a timing regressed
+# The render case needs a display; without one it starts Xvfb when it is installed.
+import argparse
+import gc
+import json
+import os
+import platform
+import queue
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.parse
+from email.utils import formatdate
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Every default path in news_core (settings, cache, archive, perf log, daemon socket) is
+# resolved at import; pointing them at a scratch dir keeps runs out of the user's real data
+BENCH_HOME = tempfile.mkdtemp(prefix="cybernews-bench-")
+os.environ["CYBERNEWS_HOME"] = BENCH_HOME
+import news_core
+from news_core import FeedCache, FeedFetcher, QuoteService, EntryStore, SearchIndex, ArticleArchive, StoryClusterer, Entry, visible_entries
+import news_daemon
+from news_daemon import NewsDaemon, DaemonClient
+
+WORDS = ["トヨタ", "決算", "日銀", "金利", "円安", "株価", "半導体", "ニュース", "速報", "選挙",
+         "Market", "Earnings", "Fed", "Rates", "Chip", "Oil", "Tokyo", "Nikkei", "Reuters", "Bloomberg"]
+QUERIES = ["トヨタ 決算", "market earnings", "にゅーす"]
+
+# --- SYNTHETIC FEEDS ---
+def headline(rng, i): return f"{' '.join(rng.choice(WORDS) for _ in range(6))} #{i}"
+
+def make_rss(feed_id, items=20):
+    rng = random.Random(feed_id)
+    now = time.time()
+    body = "".join(
+        f"<item><title>{headline(rng, i)}</title><link>https://example.com/{feed_id}/{i}</link>"
+        f"<guid isPermaLink=\"false\">{feed_id}-{i}</guid><pubDate>{formatdate(now - i * 600 - feed_id, usegmt=True)}</pubDate>"
+        f"<description>&lt;p&gt;{' '.join(rng.choice(WORDS) for _ in range(25))}&lt;/p&gt;</description></item>"
+        for i in range(items))
+    return f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel><title>feed {feed_id}</title>{body}</channel></rss>".encode("utf-8")
+
+def make_entries(n, sources=100):
+    # Already-parsed entries for the merge/filter/render cases, grouped like a fetch result
+    rng, now, by_source = random.Random(n), time.time(), {}
+    for i in range(n):
+        src = f"SRC{i % sources:04d}"
+        by_source.setdefault(src, []).append(Entry(
+            f"https://example.com/{src}/{i}", headline(rng, i), " ".join(rng.choice(WORDS) for _ in range(25)), src, int(now - i * 7), f"{src}-{i}"))
+    return by_source
+
+def make_stories(n, copies=3):
+    # n entries as stories carried by 1..copies sources with light edits, like aggregator feeds.
+    # Returns (entries, {link: story number}) so clustering quality can be scored.
+    rng, entries, truth = random.Random(n), [], {}
+    kana = [chr(c) for c in range(0x30A2, 0x30F3)] + [chr(c) for c in range(0x4E00, 0x4E00 + 2000)]
+    while len(entries) < n:
+        story = len(set(truth.values()))
+        words = ["".join(rng.choice(kana) for _ in range(rng.randint(2, 4))) for _ in range(8)]
+        for c in range(rng.randint(1, copies)):
+            w = list(words)
+            if c: w[rng.randrange(len(w))] = rng.choice(["速報", "詳報", "更新", "Update"])
+            link = f"https://example.com/story/{story}/{c}"
+            entries.append(Entry(link, f"{'、'.join(w)} - SRC{c:02d}", "", f"SRC{c:02d}", int(time.time()) - len(entries)))
+            truth[link] = story
+    return entries[:n], truth
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        feed_id = int(self.path.split("?", 1)[0].rsplit("/", 1)[-1] or 0)
+        body = self.server.bodies.get(feed_id) or self.server.bodies.setdefault(feed_id, make_rss(feed_id))
+        self.server.hits[feed_id] += 1
+        etag = f'"{feed_id}-{len(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304); self.end_headers(); return
+        self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml"); self.send_header("Content-Length", str(len(body))); self.send_header("ETag", etag)
+        self.end_headers(); self.wfile.write(body)
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.bodies, self.bytes_sent, self.hits = {}, 0, Counter()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self, feed_id): return f"http://127.0.0.1:{self.server_port}/feed/{feed_id}"
+
+class ChartHandler(BaseHTTPRequestHandler):
+    # Yahoo-style chart JSON over keep-alive HTTP/1.1. Symbols in server.failing answer 500,
+    # symbols in server.slow stall for server.stall_s before answering.
+    protocol_version = "HTTP/1.1"
+    wbufsize = 65536  # headers and body leave in one segment; split writes hit delayed-ACK stalls
+
+    def log_message(self, *args): pass
+
+    def setup(self):
+        super().setup(); self.server.connections += 1
+
+    def do_GET(self):
+        symbol = urllib.parse.unquote(self.path.split("?", 1)[0].rsplit("/", 1)[-1])
+        self.server.requests += 1
+        if symbol in self.server.slow: time.sleep(self.server.stall_s)
+        status, body = (500, b"{}") if symbol in self.server.failing else \
+            (200, json.dumps({"chart": {"result": [{"meta": {"regularMarketPrice": 100.0 + len(symbol), "previousClose": 100.0}}]}}).encode())
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+        except OSError: pass  # the client gave up on a stalled symbol
+
+class ChartServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ChartHandler)
+        self.connections, self.requests, self.failing, self.slow, self.stall_s = 0, 0, set(), set(), 1.0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self): return f"http://127.0.0.1:{self.server_port}/chart/{{id}}"
+
+# --- CASES ---
+def timed(fn):
+    t = time.perf_counter(); result = fn()
+    return (time.perf_counter() - t) * 1000, result
+
+def stats(samples):
+    samples = sorted(samples)
+    return {"mean_ms": round(statistics.fmean(samples), 3), "p95_ms": round(samples[int(len(samples) * 0.95)], 3), "max_ms": round(samples[-1], 3)}
+
+def bench_fetch(server, n_sources):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = FeedFetcher(FeedCache(cache_dir))
+        sources = [{"name": f"SRC{i:04d}", "url": server.url(i)} for i in range(n_sources)]
+        server.bytes_sent = 0
+        cold_ms, (results, errors) = timed(lambda: fetcher.fetch_all(sources))
+        sent = server.bytes_sent
+        before = fetcher.metrics.snapshot()
+        warm_ms, _ = timed(lambda: fetcher.fetch_all(sources))  # every source answers 304
+        after = fetcher.metrics.snapshot()
+        fetcher.pool.shutdown()
+    parses = lambda snap: snap["histograms"].get("fetch.parse", {}).get("n", 0)
+    not_modified = after["counters"].get("fetch.status.304", 0) - before["counters"].get("fetch.status.304", 0)
+    checks = {"warm_no_body": server.bytes_sent == sent, "warm_all_304": not_modified == n_sources, "warm_no_parse": parses(after) == parses(before)}
+    return {"cold_ms": round(cold_ms, 1), "warm_ms": round(warm_ms, 1), "sources_per_s": round(n_sources / cold_ms * 1000, 1),
+            "bytes": sent, "entries": sum(map(len, results.values())), "errors": len(errors), "checks": checks}
+
+def bench_merge(n_entries):
+    batch = make_entries(n_entries)
+    store = EntryStore()
+    initial_ms, _ = timed(lambda: store.merge(batch))
+    steady_ms, _ = timed(lambda: store.merge(batch))  # refresh with nothing new
+    fresh = {src: entries[:1] + [Entry(e.link + "/new", e.title, e.summary, e.src, e.ts, e.guid + "/new") for e in entries[:1]] for src, entries in batch.items()}
+    incremental_ms, delta = timed(lambda: store.merge(fresh))  # one new + many dropped per source
+    return {"initial_ms": round(initial_ms, 1), "steady_ms": round(steady_ms, 1), "incremental_ms": round(incremental_ms, 1),
+            "per_entry_us": round(initial_ms * 1000 / n_entries, 2), "added": len(delta.added), "removed": len(delta.removed)}
+
+def bench_filter(n_entries):
+    store = EntryStore(); store.merge(make_entries(n_entries))
+    entries = store.entries()
+    index = SearchIndex()
+    index_ms, _ = timed(lambda: index.update(entries))
+    active = {e.src: True for e in entries}
+    samples = []
+    for query in QUERIES:
+        for i in range(1, len(query) + 1):  # one sample per keystroke, typed left to right
+            samples.append(timed(lambda: visible_entries(index, query[:i], active, set(), sources_of=store.sources_of))[0])
+    # One article carried by two sources: hidden only once both are off, re-badged when the first one drops it
+    e = entries[0]
+    shared = EntryStore(); shared.merge({e.src: [e], "OTHER": [Entry(e.link, e.title, e.summary, "OTHER", e.ts, e.guid)]})
+    index.update(shared.entries())
+    shown = lambda active: len(visible_entries(index, "", active, set(), sources_of=shared.sources_of))
+    checks = {"any_owner_on": shown({e.src: False}) == 1 and shown({e.src: False, "OTHER": False}) == 0}
+    handoff = shared.merge({e.src: []})
+    checks["src_handoff"] = [x.src for x in handoff.updated] == ["OTHER"] and not handoff.removed and shared.entries()[0].src == "OTHER"
+    return {"index_ms": round(index_ms, 1), "keystrokes": len(samples), **stats(samples), "checks": checks}
+
+def bench_archive(n_entries):
+    # Ingest in fetch-sized batches through the writer thread, then query like the search box does
+    batch = [e for entries in make_entries(n_entries).values() for e in entries]
+    with tempfile.TemporaryDirectory() as home:
+        archive = ArticleArchive(os.path.join(home, "archive.db"), retention_days=0, max_items=0)
+        def ingest():
+            for i in range(0, len(batch), 1000): archive.add(batch[i:i + 1000])
+            archive.close(timeout=None)
+        ingest_ms, _ = timed(ingest)
+        samples = []
+        for query in QUERIES:
+            for i in range(1, len(query) + 1): samples.append(timed(lambda: archive.search(query[:i]))[0])
+        since = time.time() - n_entries * 7 / 2
+        filtered = [timed(lambda: archive.search(q, ["SRC0001"], since))[0] for q in QUERIES]
+        size = sum(os.path.getsize(p) for p in (archive.path, archive.path + "-wal") if os.path.exists(p))
+        # A new article and a retitled copy of it in one writer batch must land as one row
+        first, other = batch[0], batch[1]
+        same = ArticleArchive(os.path.join(home, "same-batch.db"), retention_days=0, max_items=0)
+        same.add([first, Entry(first.link, "Zebra retitled", first.summary, first.src, first.ts, first.guid), other])
+        same.close(timeout=None)
+        checks = {"same_batch_update": same.count() == 2 and [e.title for e in same.search("zebra")] == ["Zebra retitled"]
+                  and [e.link for e in same.search(other.title)] == [other.link]}
+        return {"ingest_ms": round(ingest_ms, 1), "rows_per_s": round(n_entries / ingest_ms * 1000), "db_kb": size // 1024,
+                "keystroke": stats(samples), "filtered": stats(filtered), "checks": checks}
+
+class GcClock:
+    # gc.callbacks hook: milliseconds spent in cyclic collections, whichever allocation triggered them
+    def __init__(self): self.ms, self.t = 0.0, None
+
+    def __call__(self, phase, info):
+        if phase == "start": self.t = time.perf_counter()
+        elif self.t is not None: self.ms += (time.perf_counter() - self.t) * 1000; self.t = None
+
+def bench_cluster(n_entries):
+    entries, truth = make_stories(n_entries)
+    full = StoryClusterer(budget_ms=0)
+    full_ms, _ = timed(lambda: full.update(entries))
+    # Purity: clusters whose members are all one story. Recall: copies placed with their story's first item.
+    pure = sum(len({truth[link] for link in links}) == 1 for links in full.members.values())
+    firsts = {}
+    for e in entries: firsts.setdefault(truth[e.link], e.link)
+    copies = [e.link for e in entries if firsts[truth[e.link]] != e.link]
+    found = sum(1 for link in copies if full.cluster_of.get(link) is not None and full.cluster_of.get(link) == full.cluster_of.get(firsts[truth[link]]))
+    # The widget drains the backlog in budgeted passes on the Tk thread; every pass must stay in
+    # budget. Full GC pauses land in whichever pass triggers them and scale with the whole heap
+    # (here mostly the bench's own entries), so they are reported apart rather than checked.
+    budgeted, clock = StoryClusterer(), GcClock()
+    passes, in_gc = [], []
+    gc.callbacks.append(clock)
+    try:
+        while not passes or budgeted.backlog:
+            before = clock.ms
+            passes.append(timed(lambda: budgeted.update(entries if not passes else ()))[0]); in_gc.append(clock.ms - before)
+            if len(passes) == 1: pass_done = n_entries - len(budgeted.backlog)
+    finally: gc.callbacks.remove(clock)
+    work = [p - g for p, g in zip(passes, in_gc)]
+    # Up to widget scale every pass must fit; beyond it the bucket dict's rare resize (~30 ms at
+    # 1.6M keys for 100k titles) is the one-off exception, so only the p95 pass is held to budget
+    worst = max(work) if n_entries <= 10000 else stats(work)["p95_ms"]
+    collapse_ms, (rows, _) = timed(lambda: full.collapse(entries))
+    # Pinning an older copy of a story makes it the lead instead of letting the newest copy hide it
+    story = next((links for links in full.members.values() if len(links) > 1), set())
+    oldest = [e.link for e in entries if e.link in story][-1:]
+    _, pinned_heads = full.collapse(entries, pinned=set(oldest))
+    pinned_lead = all(link in pinned_heads for link in oldest)
+    return {"full_ms": round(full_ms, 1), "per_entry_us": round(full_ms * 1000 / n_entries, 1), "pass": stats(passes), "pass_work": stats(work), "gc_max_ms": round(max(in_gc), 1), "passes": len(passes),
+            "pass_done": pass_done, "collapse_ms": round(collapse_ms, 1), "cards": len(rows), "stories": len(firsts),
+            "purity": round(pure / max(1, len(full.members)), 3), "recall": round(found / max(1, len(copies)), 3),
+            "checks": {"budget": worst <= news_core.CLUSTER_BUDGET_MS + 2, "drained_same": budgeted.cluster_of.keys() == full.cluster_of.keys(), "pinned_lead": pinned_lead}}
+
+def bench_daemon(server, n_subscribers, n_sources=20):
+    # n widgets attached to one daemon, against n standalone widgets polling the same sources each
+    def settle(inbox, names):
+        # Reads one subscriber's messages until every source has reported
+        pending = set(names)
+        while pending:
+            msg = inbox.get(timeout=30)
+            if msg["type"] == "snapshot": pending -= set(msg["sources"])
+            elif msg["type"] == "source": pending.discard(msg["name"])
+    with tempfile.TemporaryDirectory() as home:
+        news_daemon.WEATHER_URL = server.url(1)
+        address = os.path.join(home, "daemon.sock") if hasattr(socket, "AF_UNIX") else ("127.0.0.1", 0)
+        daemon = NewsDaemon(address, cache=FeedCache(os.path.join(home, "cache")))
+        daemon.start()
+        sources = [{"name": f"SRC{i:04d}", "url": server.url(1000 + i)} for i in range(n_sources)]
+        feeds = lambda: sum(server.hits[1000 + i] for i in range(n_sources))
+        before, clients, inboxes = feeds(), [], []
+        try:
+            t = time.perf_counter()
+            for _ in range(n_subscribers):
+                inbox = queue.Queue(); client = DaemonClient(daemon.address, inbox.put)
+                if not client.connect(): return {"skipped": "daemon not reachable"}
+                client.subscribe(sources, []); clients.append(client); inboxes.append(inbox)
+            for inbox in inboxes: settle(inbox, [s["name"] for s in sources])
+            sync_ms, upstream = (time.perf_counter() - t) * 1000, feeds() - before
+            refresh_ms, _ = timed(lambda: (clients[0].refresh(), [settle(inbox, [s["name"] for s in sources]) for inbox in inboxes]))
+            def detach(*attached):
+                for client in attached: client.close()
+                deadline = time.monotonic() + 5
+                while daemon.subscribers and time.monotonic() < deadline: time.sleep(0.01)
+            detach(*clients)
+            # A widget attaching to the idle daemon gets the kept items from its snapshot, without an upstream fetch
+            hits, inbox = feeds(), queue.Queue()
+            client = DaemonClient(daemon.address, inbox.put); client.connect(); client.subscribe(sources, [])
+            snapshot = next(msg for msg in iter(lambda: inbox.get(timeout=30), None) if msg["type"] == "snapshot")
+            time.sleep(0.3); reconnect = feeds() - hits
+            detach(client)
+            # With nobody attached even a forced poll must not reach upstream
+            idle = feeds(); daemon.poller.poll_now(); time.sleep(0.5); idle = feeds() - idle
+        finally: daemon.stop()
+    return {"first_sync_ms": round(sync_ms, 1), "refresh_ms": round(refresh_ms, 1), "upstream_requests": upstream,
+            "standalone_requests": n_subscribers * n_sources, "reconnect_requests": reconnect, "idle_requests": idle,
+            "checks": {"shared": upstream == n_sources, "reconnect_snapshot": len(snapshot["sources"]) == n_sources,
+                       "reconnect_cached": reconnect == 0, "paused": daemon.poller.paused and idle == 0}}
+
+def retained_kb(build):
+    # Heap still held by whatever build() returns, once its temporaries are gone
+    gc.collect(); tracemalloc.start()
+    try:
+        kept = build()
+        return round(tracemalloc.get_traced_memory()[0] / 1024, 1), kept
+    finally: tracemalloc.stop()
+
+def bench_quotes(chart, n_symbols=4, timeout=0.2):
+    # QuoteService against the chart fixture: connection reuse, stale fallback, timeout
+    symbols = [{"name": f"Q{i}", "id": f"^Q{i}"} for i in range(n_symbols)]
+    quotes = QuoteService(symbols, url=chart.url(), timeout=timeout)
+    chart.connections = chart.requests = 0; chart.failing.clear(); chart.slow.clear()
+    cold_ms, _ = timed(quotes.refresh)
+    warm_ms, _ = timed(quotes.refresh)
+    connections, requests = chart.connections, chart.requests
+    kept = quotes.last["^Q1"]
+    chart.failing.add("^Q1")
+    text = quotes.refresh()
+    stale = quotes.last["^Q1"] is kept and "^Q1" in quotes.stale and f"Q1: {kept.price:,.1f}" in text and "STALE" in text
+    chart.failing.clear(); chart.slow.add("^Q2")
+    stalled_ms, _ = timed(quotes.refresh)
+    chart.slow.clear()
+    return {"cold_ms": round(cold_ms, 1), "warm_ms": round(warm_ms, 1), "connections": connections, "requests": requests, "stalled_ms": round(stalled_ms, 1),
+            "checks": {"keepalive": connections == 1 and requests == 2 * n_symbols, "stale_kept": stale,
+                       "timeout": "^Q2" in quotes.stale and stalled_ms < timeout * 1000 + 150}}
+
+def bench_memory(n_sources):
+    # Parsed feeds as feedparser returns them vs the Entry records FeedFetcher keeps instead
+    import feedparser
+    bodies = [make_rss(i) for i in range(n_sources)]
+    feeds_kb, feeds = retained_kb(lambda: [feedparser.parse(b) for b in bodies])
+    del feeds
+    entries_kb, entries = retained_kb(lambda: [[Entry.from_feed(e, f"SRC{i:04d}") for e in feedparser.parse(b).entries[:news_core.FETCH_MAX_ITEMS]]
+                                               for i, b in enumerate(bodies)])
+    n = sum(map(len, entries))
+    return {"feedparser_kb": feeds_kb, "entry_kb": entries_kb, "entries": n, "bytes_per_entry": round(entries_kb * 1024 / n), "ratio": round(feeds_kb / entries_kb, 1)}
+
+def bench_render(server, chart, n_entries):
+    import tkinter as tk
+    import news_widget
+    with tempfile.TemporaryDirectory() as home:
+        settings = os.path.join(home, "settings.json")
+        news_core.SettingsStore(settings).save({"sources": [{"name": "BENCH", "url": server.url(0)}]})
+        news_widget.WEATHER_URL = server.url(1)
+        try: root = tk.Tk()
+        except tk.TclError as e: return {"skipped": f"no display ({e})"}
+        try:
+            app = news_widget.CyberNewsWidget(root, settings_path=settings, warm_start=False)
+            app.quotes.url = chart.url()
+            root.update()
+            batch = make_entries(n_entries)
+            merge_ms, _ = timed(lambda: (app.update_data(batch), root.update_idletasks()))
+            root.update()
+            refresh = [timed(lambda: (app.refresh_display(), root.update_idletasks()))[0] for _ in range(10)]
+            create = [timed(lambda: (app.create_card(), root.update_idletasks()))[0] for _ in range(20)]
+            scroll = []
+            for _ in range(50): scroll.append(timed(lambda: (app.canvas.yview_scroll(1, "units"), root.update_idletasks()))[0])
+            return {"update_data_ms": round(merge_ms, 1), "refresh_display": stats(refresh), "create_card": stats(create),
+                    "scroll_step": stats(scroll), "card_pool": len(app.news_list.pool)}
+        finally: root.destroy()
+
+def ensure_display():
+    if sys.platform == "win32" or os.environ.get("DISPLAY"): return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb: return None
+    proc = subprocess.Popen([xvfb, ":97", "-screen", "0", "1280x1024x24"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0); os.environ["DISPLAY"] = ":97"
+    return proc
+
+# --- REPORTING ---
+def flatten(metrics, prefix=""):
+    for k, v in metrics.items():
+        if isinstance(v, dict): yield from flatten(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)): yield f"{prefix}{k}", v
+
+def failed_checks(records):
+    # Cases report pass/fail invariants under metrics["checks"]; any False fails the run
+    failed = 0
+    for r in records:
+        for name, ok in r["metrics"].get("checks", {}).items():
+            if not ok: failed += 1; print(f"{'FAILED':10} {r['bench']:7} {json.dumps(r['params']):22} {name}", file=sys.stderr)
+    return failed
+
+def compare(records, baseline_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        base = {(r["bench"], json.dumps(r["params"], sort_keys=True)): r["metrics"] for r in map(json.loads, f) if r.get("bench")}
+    regressions = 0
+    for r in records:
+        old = dict(flatten(base.get((r["bench"], json.dumps(r["params"], sort_keys=True)), {})))
+        for name, value in flatten(r["metrics"]):
+            if not name.endswith("_ms") or not old.get(name): continue
+            ratio = value / old[name]
+            flag = "REGRESSION" if ratio > threshold else "ok"
+            regressions += flag != "ok"
+            print(f"{flag:10} {r['bench']:7} {json.dumps(r['params']):22} {name:28} {old[name]:>10.2f} -> {value:>10.2f} ({ratio:.2f}x)", file=sys.stderr)
+    return regressions
+
+def main():
+    p = argparse.ArgumentParser(description="CORE_INTEL pipeline benchmarks")
+    p.add_argument("--sources", default="10,100,1000", help="source counts for the fetch case")
+    p.add_argument("--entries", default="1000,10000,100000", help="entry counts for merge/filter/render")
+    p.add_argument("--subscribers", default="1,10,50", help="widgets attached for the daemon case")
+    p.add_argument("--only", default="fetch,memory,quotes,merge,filter,cluster,archive,daemon,render")
+    p.add_argument("--out", help="append JSON lines here as well as stdout")
+    p.add_argument("--compare", help="previous --out file to diff against")
+    p.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = p.parse_args()
+    cases, sizes, counts = args.only.split(","), [int(x) for x in args.sources.split(",")], [int(x) for x in args.entries.split(",")]
+    env = {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+    server, chart, xvfb, records = FeedServer(), ChartServer(), None, []
+
+    def emit(bench, params, metrics):
+        rec = {"bench": bench, "params": params, "metrics": metrics, "env": env, "ts": round(time.time())}
+        records.append(rec); print(json.dumps(rec, ensure_ascii=False), flush=True)
+
+    try:
+        if "fetch" in cases:
+            for n in sizes: emit("fetch", {"sources": n}, bench_fetch(server, n))
+        if "memory" in cases:
+            for n in sizes: emit("memory", {"sources": n}, bench_memory(n))
+        if "quotes" in cases: emit("quotes", {}, bench_quotes(chart))
+        if "merge" in cases:
+            for n in counts: emit("merge", {"entries": n}, bench_merge(n))
+        if "filter" in cases:
+            for n in counts: emit("filter", {"entries": n}, bench_filter(n))
+        if "cluster" in cases:
+            for n in counts: emit("cluster", {"entries": n}, bench_cluster(n))
+        if "archive" in cases:
+            for n in counts: emit("archive", {"entries": n}, bench_archive(n))
+        if "daemon" in cases:
+            for n in [int(x) for x in args.subscribers.split(",")]: emit("daemon", {"subscribers": n}, bench_daemon(server, n))
+        if "render" in cases:
+            xvfb = ensure_display()
+            for n in counts: emit("render", {"entries": n}, bench_render(server, chart, n))
+    finally:
+        server.shutdown(); chart.shutdown()
+        if xvfb: xvfb.terminate()
+        shutil.rmtree(BENCH_HOME, ignore_errors=True)
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            for rec in records: f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    failed = failed_checks(records)
+    if (args.compare and compare(records, args.compare, args.threshold)) or failed: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1113 @@
+# --- CORE_INTEL HEADLESS CORE ---
+# Everything here is GUI-free: fetch, cache, parse, merge, sort, filter, card models,
+# quotes and persistence. news_widget.py renders it; bench_news.py measures it.
+import time
+import re
+import os
+import sys
+import random
+import json
+import threading
+import queue
+import hashlib
+import bisect
+import calendar
+import sqlite3
+import unicodedata
+import urllib.request
+import http.client
+import urllib.error
+import urllib.parse
+from datetime import datetime
+from collections import namedtuple, OrderedDict, Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+DEFAULT_SOURCES = [
+    {"name": "Reuters", "url": "https://news.google.com/rss/search?q=source:Reuters&hl=ja&gl=JP&ceid=JP:ja"},
+    {"name": "Bloomberg", "url": "https://news.google.com/rss/search?q=source:Bloomberg&hl=ja&gl=JP&ceid=JP:ja"}
+]
+DEFAULT_QUOTES = [
+    {"name": "NIKKEI", "id": "^N225"}, {"name": "DOW", "id": "^DJI"},
+    {"name": "NASDAQ", "id": "^IXIC"}, {"name": "USD/JPY", "id": "USDJPY=X"}
+]
+QUOTE_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{id}?interval=1m&range=1d"
+WEATHER_URL = "https://news.google.com/rss/search?q=weather+tokyo&hl=ja&gl=JP&ceid=JP:ja"
+
+USER_AGENT = "Mozilla/5.0"
+FETCH_WORKERS = 8      # bounded pool shared by every source
+FETCH_TIMEOUT = 10     # per-source connect/read timeout (s)
+FETCH_DEADLINE = 30    # global deadline for one refresh cycle (s)
+FETCH_MAX_ITEMS = 10
+SUMMARY_MAX = 200      # chars of tag-stripped summary kept per entry
+POLL_INTERVAL = 900    # starting per-source poll interval (s)
+POLL_MIN = 120         # adaptive bounds for feeds that change often / rarely
+POLL_MAX = 3600
+POLL_RETRY = 30        # first retry after an error; doubles per consecutive failure up to POLL_MAX
+QUOTE_TIMEOUT = 8
+QUOTE_INTERVAL_MS = 60000
+SNAPSHOT_MAX = 200
+READ_HISTORY_MAX = 5000
+READ_HISTORY_DAYS = 90
+PINNED_MAX = 1000
+ARCHIVE_DAYS = 365            # retention of the article archive; 0 keeps everything
+ARCHIVE_MAX = 500000          # hard cap on archived articles, oldest go first
+ARCHIVE_COMPACT_S = 86400     # prune + FTS optimize at most this often
+ARCHIVE_LIMIT = 300           # rows returned per archive query
+MINHASH_PERM = 32             # hash values per title signature
+MINHASH_BANDS = 16            # LSH bands of 2 values: pairs above ~0.25 Jaccard become candidates
+CLUSTER_THRESHOLD = 0.5       # shingle Jaccard a candidate needs to join a story
+CLUSTER_BUDGET_MS = 8         # clustering work per pass (it runs on the Tk thread, like RENDER_SLICE_MS); the rest waits in the backlog
+CLUSTER_BUCKET_MAX = 64       # an LSH bucket this full is a common phrase, not a story; it stops collecting
+DAEMON_PORT = 47913           # localhost TCP port of news_daemon where Unix sockets are unavailable
+
+def default_data_dir():
+    # CYBERNEWS_HOME overrides; otherwise LOCALAPPDATA on Windows and the XDG data dir elsewhere
+    if os.environ.get("CYBERNEWS_HOME"): return os.environ["CYBERNEWS_HOME"]
+    if os.environ.get("LOCALAPPDATA"): return os.environ["LOCALAPPDATA"]
+    return os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "CyberNewsWidget")
+
+DATA_DIR = default_data_dir()
+SETTINGS_FILE = os.path.join(DATA_DIR, "CyberNewsWidget_Settings.json")
+CACHE_DIR = os.path.join(DATA_DIR, "CyberNewsWidget_Cache")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "CyberNewsWidget_Snapshot.json")
+PERF_LOG = os.path.join(DATA_DIR, "CyberNewsWidget_Perf.jsonl")
+METRICS_FILE = os.path.join(DATA_DIR, "CyberNewsWidget_Metrics.jsonl")
+ARCHIVE_FILE = os.path.join(DATA_DIR, "CyberNewsWidget_Archive.db")
+DAEMON_SOCKET = os.path.join(DATA_DIR, "CyberNewsWidget_Daemon.sock")
+DAEMON_TOKEN = os.path.join(DATA_DIR, "CyberNewsWidget_Daemon.token")  # TCP fallback only
+
+# --- INSTRUMENTATION ---
+class Histogram:
+    __slots__ = ("n", "total", "max", "counts")
+    BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)  # ms bucket upper bounds
+
+    def __init__(self): self.n, self.total, self.max, self.counts = 0, 0.0, 0.0, [0] * (len(self.BOUNDS) + 1)
+
+    def add(self, value):
+        self.n += 1; self.total += value; self.max = max(self.max, value)
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th sample, never above the observed max
+        rank, seen = p * self.n, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank: return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return 0.0
+
+    def to_dict(self):
+        return {"n": self.n, "mean": round(self.total / self.n, 3) if self.n else 0.0, "p50": self.percentile(0.5), "p95": self.percentile(0.95),
+                "max": round(self.max, 3), "buckets": dict(zip([*map(str, self.BOUNDS), "inf"], self.counts))}
+
+class Metrics:
+    # Counters, latency histograms (ms) and a bounded event log. Fetch and quote workers
+    # record from their own threads, hence the lock.
+    def __init__(self, max_events=10000):
+        self.lock = threading.Lock()
+        self.counters, self.hists = Counter(), {}
+        self.events = deque(maxlen=max_events)
+        self.sources = {}  # source name -> its latest fetch sample
+
+    def count(self, name, n=1):
+        with self.lock: self.counters[name] += n
+
+    def observe(self, name, ms):
+        with self.lock:
+            h = self.hists.get(name)
+            if h is None: h = self.hists[name] = Histogram()
+            h.add(ms)
+
+    def event(self, kind, **fields):
+        with self.lock: self.events.append({"ts": round(time.time(), 3), "event": kind, **fields})
+
+    def error(self, where, exc, **fields):
+        self.count(f"errors.{where}")
+        self.event("error", where=where, error=f"{type(exc).__name__}: {exc}", **fields)
+
+    @contextmanager
+    def timer(self, name):
+        t = time.perf_counter()
+        try: yield
+        finally: self.observe(name, (time.perf_counter() - t) * 1000)
+
+    def fetch_sample(self, source, status, nbytes, download_ms, parse_ms):
+        sample = {"source": source, "status": status, "bytes": nbytes, "download_ms": round(download_ms, 2), "parse_ms": round(parse_ms, 2)}
+        self.observe("fetch.download", download_ms)
+        if parse_ms: self.observe("fetch.parse", parse_ms)
+        self.count("fetch.bytes", nbytes); self.count(f"fetch.status.{status}")
+        with self.lock: self.sources[source] = sample
+        self.event("fetch", **sample)
+
+    def snapshot(self):
+        with self.lock:
+            return {"counters": dict(self.counters), "histograms": {k: h.to_dict() for k, h in self.hists.items()}, "sources": dict(self.sources)}
+
+    def summary_lines(self):
+        snap = self.snapshot()
+        lines = [f"{name[:24]:24} n={h['n']:<6} p50 {h['p50']:>5g} p95 {h['p95']:>5g} max {h['max']:>7.1f} ms" for name, h in sorted(snap["histograms"].items())]
+        errors = {k[7:]: v for k, v in snap["counters"].items() if k.startswith("errors.")}
+        if errors: lines.append("ERRORS  " + "  ".join(f"{k} {v}" for k, v in sorted(errors.items())))
+        lines.append(f"FETCHED {snap['counters'].get('fetch.bytes', 0) / 1024:.0f}KB")
+        for s in snap["sources"].values():
+            lines.append(f"  {s['source'][:14]:14} {s['status']} {s['bytes'] / 1024:6.1f}KB dl {s['download_ms']:6.0f} parse {s['parse_ms']:5.0f} ms")
+        return lines
+
+    def export_jsonl(self, path=METRICS_FILE):
+        # Buffered events since the last export (drained, so exporting twice never repeats one),
+        # then one summary record with the cumulative counters and histograms
+        with self.lock: events = list(self.events); self.events.clear()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for e in events: f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"ts": round(time.time(), 3), "event": "summary", **self.snapshot()}, ensure_ascii=False) + "\n")
+        return len(events)
+
+# --- PERSISTENCE ---
+class LinkHistory:
+    # Insertion-ordered link -> last-touched epoch. Touching moves a link to the end, and
+    # the oldest links are evicted past max_items or max_age_days, keeping settings small.
+    def __init__(self, items=(), max_items=None, max_age_days=None):
+        self.max_items, self.max_age = max_items, max_age_days * 86400 if max_age_days else None
+        self.links = OrderedDict()
+        now = time.time()
+        # Older settings files stored bare links; they count as touched now
+        for item in items:
+            link, ts = (item, now) if isinstance(item, str) else item
+            self.links[link] = ts
+        self.links = OrderedDict(sorted(self.links.items(), key=lambda kv: kv[1]))
+        self.evict()
+
+    def __contains__(self, link): return link in self.links
+    def __len__(self): return len(self.links)
+    def __iter__(self): return iter(self.links)
+
+    def add(self, link):
+        self.links[link] = time.time(); self.links.move_to_end(link); self.evict()
+
+    def remove(self, link): del self.links[link]
+    def discard(self, link): self.links.pop(link, None)
+
+    def evict(self):
+        if self.max_items:
+            while len(self.links) > self.max_items: self.links.popitem(last=False)
+        if self.max_age:
+            cutoff = time.time() - self.max_age
+            while self.links and next(iter(self.links.values())) < cutoff: self.links.popitem(last=False)
+
+    def dump(self): return [[link, round(ts)] for link, ts in self.links.items()]
+
+class SettingsStore:
+    # Atomic JSON persistence: each write goes to a temp file that is fsynced and renamed
+    # over the target, so a crash leaves either the old or the new settings, never a torn
+    # file. save_async() hands the snapshot to one writer thread; later snapshots replace
+    # pending ones, so bursts collapse into a single write.
+    def __init__(self, path=SETTINGS_FILE, metrics=None):
+        self.path = path
+        self.metrics = metrics or Metrics()
+        self.pending = None
+        self.cond = threading.Condition()
+        self.lock = threading.Lock()  # serializes writers so an older snapshot never lands last
+        self.writer = None
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    def save(self, data):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def save_async(self, data):
+        with self.cond:
+            self.pending = data; self.cond.notify()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, daemon=True, name="settings-writer"); self.writer.start()
+
+    def flush(self, data=None):
+        # Synchronous write (used at shutdown); data supersedes anything still queued
+        with self.lock:
+            with self.cond:
+                data, self.pending = data if data is not None else self.pending, None
+            if data is not None: self.save(data)
+
+    def _write_loop(self):
+        while True:
+            with self.cond:
+                while self.pending is None: self.cond.wait()
+            try: self.flush()
+            except OSError as e: self.metrics.error("settings", e, path=self.path)
+
+# --- FEED CACHE ---
+class FeedCache:
+    # One <sha1(url)>.xml body plus a <sha1(url)>.json sidecar holding the validators and body digest
+    def __init__(self, path=CACHE_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, url, ext): return os.path.join(self.path, hashlib.sha1(url.encode('utf-8')).hexdigest() + ext)
+
+    def meta(self, url):
+        try:
+            with open(self._file(url, ".json"), 'r', encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    def validators(self, url):
+        meta, headers = self.meta(url), {}
+        if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url):
+        # A body that no longer matches its recorded digest (e.g. a torn write) is treated as a miss
+        try:
+            with open(self._file(url, ".xml"), 'rb') as f: body = f.read()
+        except OSError: return None
+        return body if hashlib.sha1(body).hexdigest() == self.meta(url).get("digest") else None
+
+    def store(self, url, body, headers):
+        digest = hashlib.sha1(body).hexdigest()
+        meta = {"url": url, "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"), "digest": digest}
+        self._write(self._file(url, ".xml"), body)
+        self._write(self._file(url, ".json"), json.dumps(meta).encode('utf-8'))
+        return digest
+
+    @staticmethod
+    def _write(path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f: f.write(data)
+        os.replace(tmp, path)
+
+# --- FETCH ENGINE ---
+class DaemonPool:
+    # Minimal thread pool for network calls. ThreadPoolExecutor joins its workers at
+    # interpreter exit, so one stalled socket kept the process alive after close; these
+    # workers are daemon threads and shutdown(wait=False) really does not wait.
+    def __init__(self, max_workers, thread_name_prefix="pool"):
+        self.max_workers, self.prefix = max_workers, thread_name_prefix
+        self.queue = queue.SimpleQueue()  # (future, fn, args, kwargs), or None to stop one worker
+        self.idle = threading.Semaphore(0)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        with self.lock:
+            if self.closed: raise RuntimeError("cannot schedule new futures after shutdown")
+            self.queue.put((fut, fn, args, kwargs))
+            if not self.idle.acquire(blocking=False) and len(self.threads) < self.max_workers:
+                t = threading.Thread(target=self._worker, name=f"{self.prefix}_{len(self.threads)}", daemon=True)
+                self.threads.append(t); t.start()
+        return fut
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self.lock:
+            if self.closed: return
+            self.closed = True
+            if cancel_futures:
+                while True:
+                    try: item = self.queue.get_nowait()
+                    except queue.Empty: break
+                    if item is not None: item[0].cancel()
+            for _ in self.threads: self.queue.put(None)
+        if wait:
+            for t in self.threads: t.join()
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None: return
+            fut, fn, args, kwargs = item
+            if fut.set_running_or_notify_cancel():
+                try: fut.set_result(fn(*args, **kwargs))
+                except BaseException as e: fut.set_exception(e)
+            del item, fut
+            self.idle.release()
+
+class FeedFetcher:
+    def __init__(self, cache=None, workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, deadline=FETCH_DEADLINE, max_items=FETCH_MAX_ITEMS, metrics=None):
+        self.cache = cache
+        self.metrics = metrics or Metrics()
+        self.timeout, self.deadline, self.max_items = timeout, deadline, max_items
+        self.pool = DaemonPool(workers, thread_name_prefix="feed")
+        self.parsed = {}  # url -> (body digest, label, entries, feed ttl), lets unchanged bodies skip feedparser
+        self.ttl = {}     # url -> publisher refresh hint (s) from Cache-Control max-age or RSS <ttl>
+
+    def download(self, url, deadline, headers=None):
+        req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, **(headers or {})})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            # socket timeouts only bound each read, so a trickling server is cut off by the deadline too
+            chunks = []
+            while True:
+                if time.monotonic() > deadline: raise TimeoutError("deadline exceeded")
+                chunk = response.read(65536)
+                if not chunk: break
+                chunks.append(chunk)
+            return b"".join(chunks), response.headers
+
+    def fetch_feed(self, url, deadline, label=None):
+        # Conditional GET against the disk cache; returns (entries, changed) with the first
+        # max_items items already converted to Entry records, so no parsed feed is retained.
+        # A failed fetch still leaves a sample (its error as status, the time it took).
+        t0 = time.perf_counter()
+        try: return self._fetch_feed(url, deadline, label)
+        except Exception as e:
+            self.metrics.fetch_sample(label or url, self.describe_error(e), 0, (time.perf_counter() - t0) * 1000, 0.0); raise
+
+    def _fetch_feed(self, url, deadline, label):
+        import feedparser  # deferred: costs ~100 ms at startup and is only needed once a fetch runs
+        t0, status, prev, digest = time.perf_counter(), 200, None, None
+        if self.cache is None:
+            body, headers = self.download(url, deadline)
+        else:
+            prev = self.cache.meta(url).get("digest")
+            try:
+                body, headers = self.download(url, deadline, self.cache.validators(url))
+                digest = prev if hashlib.sha1(body).hexdigest() == prev else self.cache.store(url, body, headers)
+            except urllib.error.HTTPError as e:
+                if e.code != 304: raise
+                status, body, headers = 304, self.cache.body(url), e.headers
+                if body is None:
+                    status, (body, headers) = 200, self.download(url, deadline)
+                    prev, digest = None, self.cache.store(url, body, headers)
+                else: digest = prev
+        t1 = time.perf_counter()
+        memo = self.parsed.get(url)
+        reparse = not (digest and memo and memo[0] == digest and memo[1] == label)
+        if reparse:
+            f = feedparser.parse(body)
+            if f.bozo and not f.entries: raise ValueError(f"unparsable feed: {f.get('bozo_exception')}")
+            entries = [Entry.from_feed(e, label or url) for e in f.entries[:self.max_items]]
+            feed_ttl = int(f.feed['ttl']) * 60 if str(f.feed.get('ttl', '')).isdigit() else None  # RSS <ttl> is in minutes
+            if digest: self.parsed[url] = (digest, label, entries, feed_ttl)
+        else: entries, feed_ttl = memo[2], memo[3]
+        self.ttl[url] = max(filter(None, (self.max_age(headers), feed_ttl)), default=None)
+        self.metrics.fetch_sample(label or url, status, len(body) if status == 200 else 0, (t1 - t0) * 1000, (time.perf_counter() - t1) * 1000 if reparse else 0.0)
+        return entries, digest is None or digest != prev
+
+    def parse_url(self, url, label=None): return self.fetch_feed(url, time.monotonic() + self.deadline, label)[0]
+
+    def fetch_one(self, src, deadline): return self.fetch_feed(src["url"], deadline, src["name"])[0]
+
+    def fetch_all(self, sources, on_result=None):
+        # Returns ({name: entries}, {name: error}); healthy sources are never held back by failing ones.
+        # on_result(name, entries, error) is called on this thread as each source settles, in completion order.
+        deadline = time.monotonic() + self.deadline
+        futures = {self.pool.submit(self.fetch_one, src, deadline): src['name'] for src in sources}
+        results, errors, pending = {}, {}, set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done: break
+            for fut in done:
+                name = futures[fut]
+                try: results[name] = fut.result()
+                except Exception as e: errors[name] = self.describe_error(e); self.metrics.error("fetch", e, source=name)
+                if on_result: on_result(name, results.get(name), errors.get(name))
+        for fut in pending:
+            name = futures[fut]
+            fut.cancel(); errors[name] = "TIMEOUT"; self.metrics.error("fetch", TimeoutError("global deadline"), source=name)
+            if on_result: on_result(name, None, "TIMEOUT")
+        return results, errors
+
+    @staticmethod
+    def max_age(headers):
+        match = re.search(r"(?:^|[,\s])max-age=(\d+)", (headers and headers.get("Cache-Control")) or "")
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def describe_error(e):
+        if isinstance(e, urllib.error.HTTPError): return f"HTTP {e.code}"
+        if isinstance(e, TimeoutError) or "timed out" in str(e): return "TIMEOUT"
+        if isinstance(e, urllib.error.URLError): return "OFFLINE"
+        return type(e).__name__.upper()
+
+# --- POLLING ---
+class PollState:
+    __slots__ = ("src", "interval", "due", "inflight", "failures", "links")
+
+    def __init__(self, src, interval):
+        self.src, self.interval = src, interval
+        self.due, self.inflight, self.failures, self.links = 0.0, False, 0, None
+
+class PollScheduler:
+    # One schedule per source, replacing a single global refresh timer. Each interval follows
+    # how often that feed actually changes (halved when new items show up, stretched when
+    # not), never undercuts the publisher's TTL / max-age hint, and backs off exponentially
+    # with jitter after errors. A source is never requested twice at once and at most
+    # max_inflight requests run in total. on_result(name, entries, error) is called from a
+    # fetch worker thread, like FeedFetcher.fetch_all's callback. While paused nothing new
+    # is requested; schedules are kept and whatever fell due goes out on resume.
+    def __init__(self, fetcher, on_result, max_inflight=FETCH_WORKERS, interval=POLL_INTERVAL, metrics=None):
+        self.fetcher, self.on_result = fetcher, on_result
+        self.max_inflight, self.interval = max_inflight, interval
+        self.metrics = metrics or fetcher.metrics
+        self.states = {}  # source name -> PollState
+        self.inflight = 0
+        self.cond = threading.Condition()
+        self.thread, self.running, self.paused = None, False, False
+
+    def set_paused(self, paused):
+        with self.cond: self.paused = paused; self.cond.notify()
+
+    def set_sources(self, sources):
+        # Sources already known keep their schedule; new or re-pointed ones are due immediately
+        with self.cond:
+            old, self.states = self.states, {}
+            for src in sources:
+                st = old.get(src['name'])
+                if st is None or st.src['url'] != src['url']: st = PollState(src, self.interval)
+                self.states[src['name']] = st
+            self.cond.notify()
+
+    def poll_now(self, names=None):
+        # Manual refresh. Sources already in flight are not requested again: the pending
+        # result answers this refresh too. Returns the names that will report back.
+        with self.cond:
+            picked = [st for name, st in self.states.items() if names is None or name in names]
+            for st in picked:
+                if not st.inflight: st.due = 0.0
+            self.cond.notify()
+            return [st.src['name'] for st in picked]
+
+    def start(self):
+        if self.thread: return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="poller", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond: self.running = False; self.cond.notify()
+
+    def _loop(self):
+        with self.cond:
+            while self.running:
+                now = time.monotonic()
+                waiting = [] if self.paused else sorted((st for st in self.states.values() if not st.inflight), key=lambda st: st.due)
+                for st in waiting:
+                    if st.due > now or self.inflight >= self.max_inflight: break
+                    st.inflight = True; self.inflight += 1
+                    self.fetcher.pool.submit(self._poll, st)
+                nxt = next((st.due for st in waiting if not st.inflight), None)
+                # At the cap (or with nothing scheduled) only a finishing request can change anything
+                self.cond.wait(None if nxt is None or self.inflight >= self.max_inflight else max(0.0, nxt - now))
+
+    def _poll(self, st):
+        name, url = st.src['name'], st.src['url']
+        entries = error = None
+        try: entries, _ = self.fetcher.fetch_feed(url, time.monotonic() + self.fetcher.deadline, name)
+        except Exception as e: error = self.fetcher.describe_error(e); self.metrics.error("fetch", e, source=name)
+        with self.cond:
+            st.inflight = False; self.inflight -= 1
+            if error:
+                st.failures += 1
+                delay = min(POLL_MAX, POLL_RETRY * 2 ** (st.failures - 1)) * random.uniform(0.5, 1.0)
+            else:
+                # Judged on the item links, not the body: many feeds rewrite lastBuildDate on every request
+                links = frozenset(e.link for e in entries)
+                if st.links is not None: st.interval = min(POLL_MAX, max(POLL_MIN, st.interval * (0.5 if links != st.links else 1.5)))
+                st.failures, st.links = 0, links
+                delay = max(st.interval, min(self.fetcher.ttl.get(url) or 0, POLL_MAX)) * random.uniform(0.9, 1.1)
+            st.due = time.monotonic() + delay
+            current = self.states.get(name) is st
+            self.cond.notify()
+        if current: self.on_result(name, entries, error)
+
+# --- MARKET QUOTES ---
+Quote = namedtuple("Quote", "price pct fetched")
+
+class QuoteService:
+    # Fetches chart quotes off the Tk thread over one keep-alive connection per host.
+    # The last good quote per symbol is kept, so a failed refresh shows stale values
+    # (with their age) instead of blanking the ticker.
+    def __init__(self, symbols=DEFAULT_QUOTES, url=QUOTE_URL, timeout=QUOTE_TIMEOUT, metrics=None):
+        self.symbols, self.url, self.timeout = list(symbols), url, timeout
+        self.metrics = metrics or Metrics()
+        self.last = {}      # symbol id -> last good Quote
+        self.stale = set()  # symbol ids whose latest fetch failed
+        self.lock = threading.Lock()  # last/stale are read by other threads (the daemon's snapshots) mid-refresh
+        self.conns = {}     # (scheme, host) -> open HTTP(S)Connection
+        self.busy = False
+        self.worker = DaemonPool(1, thread_name_prefix="quotes")
+
+    def refresh_async(self, callback):
+        # A refresh still in flight absorbs the next tick instead of queueing behind it
+        if self.busy: return
+        self.busy = True
+        def run():
+            try: callback(self.refresh())
+            finally: self.busy = False
+        self.worker.submit(run)
+
+    def refresh(self):
+        for sym in list(self.symbols):
+            t = time.perf_counter()
+            try:
+                q = self.fetch(sym["id"])
+                with self.lock: self.last[sym["id"]] = q; self.stale.discard(sym["id"])
+            except (OSError, ValueError, KeyError, IndexError, TypeError, http.client.HTTPException) as e:
+                with self.lock: self.stale.add(sym["id"])
+                self.metrics.error("quotes", e, symbol=sym["id"])
+            self.metrics.observe("quotes.fetch", (time.perf_counter() - t) * 1000)
+        return self.ticker_text()
+
+    def fetch(self, symbol):
+        data = json.loads(self._get(self.url.format(id=urllib.parse.quote(symbol))).decode())
+        meta = data['chart']['result'][0]['meta']
+        price, pre_close = meta['regularMarketPrice'], meta['previousClose']
+        return Quote(price, (price - pre_close) / pre_close * 100, time.time())
+
+    def _get(self, url):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        key = (parts.scheme, parts.netloc)
+        for attempt in (0, 1):
+            conn = self.conns.get(key)
+            if conn is None:
+                cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                conn = self.conns[key] = cls(parts.netloc, timeout=self.timeout)
+            try:
+                conn.request("GET", path, headers={'User-Agent': USER_AGENT})
+                resp = conn.getresponse(); body = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                # The server may have closed the idle keep-alive socket; reconnect once.
+                # A timeout is the server stalling, and retrying would only double the wait.
+                conn.close(); self.conns.pop(key, None)
+                if attempt or isinstance(e, TimeoutError): raise
+                continue
+            if resp.status != 200: raise ValueError(f"HTTP {resp.status}")
+            return body
+
+    def dump(self):
+        # JSON-safe copy of the last quotes, for handing them to another process
+        with self.lock: return {"last": {sym: list(q) for sym, q in self.last.items()}, "stale": sorted(self.stale)}
+
+    def load(self, data):
+        last, stale = {sym: Quote(*q) for sym, q in data.get("last", {}).items()}, set(data.get("stale", ()))
+        with self.lock: self.last, self.stale = last, stale
+
+    def ticker_text(self):
+        parts = []
+        for sym in self.symbols:
+            q = self.last.get(sym["id"])
+            if q is None: parts.append(f"{sym['name']}: --"); continue
+            txt = f"{sym['name']}: {q.price:,.1f} ({q.pct:+.2f}%) {'📈' if q.pct >= 0 else '📉'}"
+            if sym["id"] in self.stale: txt += f" (STALE {datetime.fromtimestamp(q.fetched).strftime('%H:%M')})"
+            parts.append(txt)
+        return " ◆ ".join(parts) + " ◆ "
+
+# --- ENTRY STORE ---
+Delta = namedtuple("Delta", "added updated removed")
+
+def normalize_link(link):
+    # Scheme/host case, trailing slashes, fragments and utm_* tracking params do not make a different article
+    parts = urllib.parse.urlsplit(link.strip())
+    query = urllib.parse.urlencode([(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if not k.startswith("utm_")])
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", query, ""))
+
+class Entry:
+    # The only fields the widget reads from a feed item. feedparser's dicts carry every raw
+    # field, content blob and nested detail structure; they are dropped as soon as this is built.
+    __slots__ = ("link", "guid", "title", "title_lc", "summary", "src", "ts")
+
+    def __init__(self, link, title, summary, src, ts=None, guid=None):
+        self.link, self.guid, self.title, self.summary, self.ts = link, guid, title, summary, ts
+        self.title_lc = normalize_text(title)
+        self.src = sys.intern(src)  # a handful of distinct names shared by thousands of entries
+
+    @classmethod
+    def from_feed(cls, e, src):
+        parsed = e.get('published_parsed') or e.get('updated_parsed')
+        return cls(e.get('link', ''), e.get('title', ''), TAG_RE.sub('', e.get('summary', ''))[:SUMMARY_MAX].strip(), src,
+                   calendar.timegm(parsed) if parsed else None, e.get('id') or None)
+
+    @classmethod
+    def from_dict(cls, d):
+        # Older snapshots used feedparser's "id"/"src_name" keys
+        return cls(d.get('link', ''), d.get('title', ''), d.get('summary', ''), d.get('src') or d['src_name'], d.get('ts'), d.get('guid') or d.get('id'))
+
+    def to_dict(self):
+        return {"link": self.link, "guid": self.guid, "title": self.title, "summary": self.summary, "src": self.src, "ts": self.ts}
+
+    def __repr__(self): return f"Entry({self.src!r}, {self.title!r})"
+
+class EntryStore:
+    # Entries keyed by normalized link, with GUIDs as aliases so the same article arriving
+    # from several sources is stored once. `order` stays sorted newest first; undated items
+    # use their first-seen time so they do not jump around between refreshes.
+    def __init__(self):
+        self.items = {}      # key -> entry
+        self.alias = {}      # normalized link / guid -> key
+        self.aliases = {}    # key -> every id aliased to it
+        self.owners = {}     # key -> names of the sources currently carrying it
+        self.key_of = {}     # stored entry's link -> key
+        self.by_source = {}  # source name -> keys from its latest fetch
+        self.sort_key = {}   # key -> (-timestamp, seq, key) as stored in order
+        self.order = []
+        self.seq = 0
+
+    def __len__(self): return len(self.items)
+
+    def entries(self): return [self.items[k] for _, _, k in self.order]
+
+    def resolve(self, e):
+        ids = [normalize_link(e.link or e.title)]
+        if e.guid: ids.append("guid:" + e.guid)
+        for i in ids:
+            if i in self.alias: return self.alias[i], ids
+        return ids[0], ids
+
+    def sources_of(self, e):
+        # Every source currently carrying e; e.src is only the one whose copy is stored
+        return self.owners.get(self.key_of.get(e.link), ())
+
+    def merge(self, results):
+        # results: {source name: entries} for the sources fetched successfully this cycle.
+        # Sources missing from results (failed or inactive) keep their previous items.
+        added, updated, removed = [], {}, []
+        for name, entries in results.items():
+            seen = set()
+            for e in entries:
+                key, ids = self.resolve(e)
+                seen.add(key)
+                for i in ids: self.alias[i] = key; self.aliases.setdefault(key, set()).add(i)
+                old = self.items.get(key)
+                if old is None:
+                    self.items[key] = e; self.owners[key] = {name}; self.key_of[e.link] = key; self._place(key, e); added.append(e)
+                    continue
+                self.owners[key].add(name)
+                if old is not e and old.src == name and (old.title, old.summary, old.ts) != (e.title, e.summary, e.ts):
+                    self.items[key] = e; self._relink(old, e, key); self._unplace(key); self._place(key, e); updated[key] = e
+            for key in self.by_source.get(name, set()) - seen:
+                owners = self.owners.get(key)
+                if owners is None: continue
+                owners.discard(name)
+                if not owners: removed.append(self._drop(key)); continue
+                old = self.items[key]
+                if old.src == name:  # the stored copy's source dropped it, so a remaining carrier takes over
+                    updated[key] = self.items[key] = Entry(old.link, old.title, old.summary, min(owners), old.ts, old.guid)
+            self.by_source[name] = seen
+        return Delta(added, list(updated.values()), removed)
+
+    def _relink(self, old, e, key):
+        if old.link != e.link: self.key_of.pop(old.link, None)
+        self.key_of[e.link] = key
+
+    def _place(self, key, e):
+        self.seq += 1
+        item = (-(e.ts if e.ts is not None else time.time()), self.seq, key)
+        self.sort_key[key] = item; bisect.insort(self.order, item)
+
+    def _unplace(self, key):
+        item = self.sort_key.pop(key)
+        del self.order[bisect.bisect_left(self.order, item)]
+
+    def _drop(self, key):
+        self._unplace(key); del self.owners[key]
+        for i in self.aliases.pop(key, ()): self.alias.pop(i, None)
+        e = self.items.pop(key)
+        self.key_of.pop(e.link, None)
+        return e
+
+# --- WARM START SNAPSHOT ---
+def snapshot_entries(store, limit=SNAPSHOT_MAX):
+    # Undated entries are saved with their first-seen time so they restore in the same place
+    out = []
+    for neg_ts, _, key in store.order[:limit]:
+        d = store.items[key].to_dict(); d["ts"] = -neg_ts
+        out.append(d)
+    return out
+
+def restore_entries(items):
+    # Grouped by source, ready for EntryStore.merge; the first real fetch of a source replaces its part
+    by_source = {}
+    for item in items:
+        e = Entry.from_dict(item)
+        by_source.setdefault(e.src, []).append(e)
+    return by_source
+
+# --- SEARCH ---
+TAG_RE = re.compile('<[^<]+?>')
+KANA_FOLD = {c: c - 0x60 for c in range(0x30A1, 0x30F7)}  # katakana -> hiragana
+
+def normalize_text(text):
+    # NFKC folds full/half-width forms (ＡＢＣ, ﾆｭｰｽ), casefold handles case, and kana folding lets ニュース match にゅーす
+    return unicodedata.normalize("NFKC", text).casefold().translate(KANA_FOLD)
+
+def search_text(e): return e.title_lc + "\n" + normalize_text(f"{e.summary}\n{e.src}")
+
+class SearchIndex:
+    def __init__(self):
+        self.rows = []  # (normalized "title\nsummary\nsource", entry), built once per entry at ingest
+        self.cache = {}
+        self.last = (None, [])  # (terms, rows) of the previous query
+
+    def update(self, entries, changed=()):
+        old, self.cache = self.cache, {}
+        for e in changed: old.pop(e.link, None)
+        for e in entries:
+            self.cache[e.link] = old.get(e.link) or search_text(e)
+        self.rows = [(self.cache[e.link], e) for e in entries]
+        self.last = (None, [])
+
+    def search(self, query):
+        # Space-separated terms are ANDed. When the query only extends the previous one
+        # (every old term is contained in some new term) the previous hits are a superset.
+        terms = normalize_text(query).split()
+        if not terms: return [e for _, e in self.rows]
+        prev_terms, prev = self.last
+        rows = prev if prev_terms and all(any(p in t for t in terms) for p in prev_terms) else self.rows
+        for t in terms: rows = [r for r in rows if t in r[0]]
+        self.last = (terms, rows)
+        return [e for _, e in rows]
+
+# --- ARCHIVE ---
+ARCHIVE_SCHEMA = """
+PRAGMA auto_vacuum = INCREMENTAL;
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, link TEXT, guid TEXT, title TEXT,
+    summary TEXT, src TEXT, ts INTEGER NOT NULL, norm TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS articles_ts ON articles (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (norm, content='articles', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, norm) VALUES ('delete', old.id, old.norm); END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF norm ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, norm) VALUES ('delete', old.id, old.norm);
+    INSERT INTO articles_fts (rowid, norm) VALUES (new.id, new.norm); END;
+"""
+ARCHIVE_UPSERT = """
+INSERT INTO articles (key, link, guid, title, summary, src, ts, norm) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET title = excluded.title, summary = excluded.summary, norm = excluded.norm
+WHERE articles.norm IS NOT excluded.norm
+"""
+
+class ArticleArchive:
+    # Every article ever merged, deduplicated by normalized link, in SQLite. An FTS5 trigram
+    # index covers the same normalized text SearchIndex uses; trigrams need no word
+    # segmentation, so Japanese matches as well as English. add() only queues: a writer
+    # thread applies everything queued in one transaction. Reads get a connection per
+    # calling thread and never wait on the writer (WAL).
+    def __init__(self, path=ARCHIVE_FILE, retention_days=ARCHIVE_DAYS, max_items=ARCHIVE_MAX, metrics=None):
+        self.path, self.retention_days, self.max_items = path, retention_days, max_items
+        self.metrics = metrics or Metrics()
+        self.pending = []
+        self.cond = threading.Condition()
+        self.writer, self.closing, self.compacted = None, False, None
+        self.local = threading.local()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode = WAL"); conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(ARCHIVE_SCHEMA)
+        conn.create_function("fold", 1, normalize_text, deterministic=True)  # src: filters compare like SearchIndex text
+        return conn
+
+    def _reader(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None: conn = self.local.conn = self._connect()
+        return conn
+
+    def add(self, entries):
+        if not entries: return
+        with self.cond:
+            self.pending.extend(entries); self.cond.notify()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, daemon=True, name="archive-writer"); self.writer.start()
+
+    def close(self, timeout=5.0):
+        # Lets the writer drain what is queued, then stops it
+        with self.cond: self.closing = True; self.cond.notify()
+        if self.writer: self.writer.join(timeout)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            with self.cond:
+                while not self.pending and not self.closing: self.cond.wait()
+                batch, self.pending, closing = self.pending, [], self.closing
+            try:
+                if batch:
+                    with self.metrics.timer("archive.ingest"): self.ingest(conn, batch)
+                if self.compacted is None or time.monotonic() - self.compacted > ARCHIVE_COMPACT_S:
+                    with self.metrics.timer("archive.compact"): self.compact(conn)
+            except sqlite3.Error as e: self.metrics.error("archive", e, path=self.path)
+            if closing: conn.close(); return
+
+    def ingest(self, conn, entries):
+        now = int(time.time())
+        rows = [(normalize_link(e.link or e.title), e.link, e.guid, e.title, e.summary, e.src, int(e.ts if e.ts is not None else now), search_text(e))
+                for e in entries]
+        # Last copy per key wins: an add and an update of one key in a batch would fire the update
+        # trigger against an FTS row that the INSERT ... SELECT below has not written yet
+        rows = list({r[0]: r for r in rows}.values())
+        with conn:
+            # New rows are indexed with one INSERT ... SELECT; a per-row trigger is ~8x slower
+            # for FTS5. Updates and deletes (rare) keep the index in step through triggers.
+            last = conn.execute("SELECT coalesce(max(id), 0) FROM articles").fetchone()[0]
+            conn.executemany(ARCHIVE_UPSERT, rows)
+            conn.execute("INSERT INTO articles_fts (rowid, norm) SELECT id, norm FROM articles WHERE id > ?", (last,))
+        self.metrics.count("archive.rows", len(rows))
+
+    def compact(self, conn):
+        # Retention by age and count, then merge FTS segments and hand freed pages back to the OS
+        with conn:
+            if self.retention_days: conn.execute("DELETE FROM articles WHERE ts < ?", (int(time.time() - self.retention_days * 86400),))
+            if self.max_items: conn.execute("DELETE FROM articles WHERE id <= (SELECT id FROM articles ORDER BY id DESC LIMIT 1 OFFSET ?)", (self.max_items,))
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+        conn.execute("PRAGMA incremental_vacuum")
+        self.compacted = time.monotonic()
+
+    def count(self): return self._reader().execute("SELECT count(*) FROM articles").fetchone()[0]
+
+    def search(self, query="", sources=None, since=None, until=None, limit=ARCHIVE_LIMIT):
+        # Terms are ANDed like SearchIndex. Terms of 3+ chars go through the trigram index;
+        # shorter ones (日銀, 円安) are LIKE filters on top of it, or on a newest-first scan
+        # that stops at `limit` when the query has nothing longer. Source names are in the
+        # indexed text too, so a source filter narrows the index walk before the exact check.
+        # Hits come back most recently archived first, which lets both paths stop early.
+        terms = normalize_text(query).split()
+        quote = lambda t: '"' + t.replace('"', '""') + '"'
+        match = [quote(t) for t in terms if len(t) >= 3]
+        names = [normalize_text(src) for src in sources or ()]
+        if names and all(len(n) >= 3 for n in names): match.append("(" + " OR ".join(map(quote, names)) + ")")
+        where, args = [], []
+        for t in terms:
+            if len(t) < 3: where.append("a.norm LIKE ? ESCAPE '\\'"); args.append("%" + re.sub(r"([%_\\])", r"\\\1", t) + "%")
+        if names: where.append(f"fold(a.src) IN ({', '.join('?' * len(names))})"); args.extend(names)
+        if since is not None: where.append("a.ts >= ?"); args.append(int(since))
+        if until is not None: where.append("a.ts < ?"); args.append(int(until))
+        cols = "a.link, a.title, a.summary, a.src, a.ts, a.guid"
+        if match:
+            where.insert(0, "articles_fts MATCH ?"); args.insert(0, " AND ".join(match))
+            sql = f"SELECT {cols} FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid WHERE {' AND '.join(where)} ORDER BY articles_fts.rowid DESC LIMIT ?"
+        else:
+            sql = f"SELECT {cols} FROM articles a {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY a.id DESC LIMIT ?"
+        t = time.perf_counter()
+        try: rows = self._reader().execute(sql, args + [limit]).fetchall()
+        except sqlite3.Error as e: self.metrics.error("archive", e, path=self.path); return []
+        self.metrics.observe("archive.query", (time.perf_counter() - t) * 1000)
+        entries = [Entry(*row) for row in rows]
+        entries.sort(key=lambda e: -e.ts)
+        return entries
+
+ARCHIVE_SPAN = {"h": 3600, "d": 86400, "w": 7 * 86400}
+
+def parse_archive_query(text, now=None):
+    # "トヨタ src:Reuters since:7d until:2024-06-30" -> ("トヨタ", ["Reuters"], since, until)
+    words, sources, since, until = [], [], None, None
+    now = time.time() if now is None else now
+    for word in text.split():
+        key, _, value = word.partition(":")
+        try:
+            if key == "src" and value: sources.append(value); continue
+            if key in ("since", "until") and value:
+                if value[-1] in ARCHIVE_SPAN and value[:-1].isdigit(): ts = now - int(value[:-1]) * ARCHIVE_SPAN[value[-1]]
+                else: ts = time.mktime(time.strptime(value, "%Y-%m-%d")) + (86400 if key == "until" else 0)  # until is inclusive
+                if key == "since": since = ts
+                else: until = ts
+                continue
+        except ValueError: pass
+        words.append(word)
+    return " ".join(words), sources, since, until
+
+# --- STORY CLUSTERING ---
+TITLE_SUFFIX_RE = re.compile(r"\s+[-‐–—|｜]\s+[^-‐–—|｜]{1,40}$")  # " - ロイター", " | bloomberg"
+SHINGLE_STRIP_RE = re.compile(r"[\W_]+")
+
+def title_shingles(title_lc):
+    # Character 3-grams need no word segmentation, so Japanese and English work the same way.
+    # The trailing " - Source" that aggregators append would otherwise make copies differ.
+    text = SHINGLE_STRIP_RE.sub("", TITLE_SUFFIX_RE.sub("", title_lc))
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2)) or frozenset([text] if text else ())
+
+def minhash(shingles, k=MINHASH_PERM):
+    # One-permutation MinHash: each shingle is hashed once and lands in one of k slots, which
+    # keep their minimum; ~k times cheaper than k separate hash functions. Empty slots borrow
+    # the nearest filled slot to their right (with the distance mixed in), so two similar
+    # sets still agree slot by slot.
+    sig = [None] * k
+    for s in shingles:
+        h = hash(s) & 0xFFFFFFFFFFFF
+        slot, value = h % k, h // k
+        if sig[slot] is None or value < sig[slot]: sig[slot] = value
+    if None in sig:
+        j = start = next(i for i, v in enumerate(sig) if v is not None)
+        for d in range(1, k):
+            i = (start - d) % k
+            if sig[i] is None: sig[i] = (sig[j], (j - i) % k)
+            else: j = i
+    return sig
+
+class StoryClusterer:
+    # Groups near-duplicate headlines (one story carried by several sources) with MinHash +
+    # LSH: a new title is only compared with titles sharing one of its band buckets, never
+    # with every other title, and candidates are confirmed on exact shingle Jaccard. Work
+    # is incremental per entry and capped per pass; what does not fit waits in `backlog`.
+    def __init__(self, threshold=CLUSTER_THRESHOLD, bands=MINHASH_BANDS, budget_ms=CLUSTER_BUDGET_MS, metrics=None):
+        self.threshold, self.bands, self.budget_ms = threshold, bands, budget_ms
+        self.width = MINHASH_PERM // bands
+        self.metrics = metrics or Metrics()
+        self.sigs = {}        # link -> (shingles, band keys)
+        self.buckets = {}     # (band, hash values) -> link, or a tuple of links once shared
+        self.cluster_of = {}  # link -> story id, only for stories with 2+ members
+        self.members = {}     # story id -> links
+        self.backlog = deque()
+        self.next_id = 0
+        self.version = 0      # bumped whenever a story gains or loses a member, so callers can skip re-rendering
+
+    def update(self, added=(), removed=()):
+        # Returns the processed entries that started a new story rather than joining one
+        if removed:
+            gone = {e.link for e in removed}
+            for link in gone: self._remove(link)
+            if self.backlog: self.backlog = deque(e for e in self.backlog if e.link not in gone)
+        self.backlog.extend(added)
+        t0, fresh = time.perf_counter(), []
+        deadline = t0 + self.budget_ms / 1000 if self.budget_ms else None
+        while self.backlog and (deadline is None or time.perf_counter() < deadline):
+            e = self.backlog.popleft()
+            self._remove(e.link)
+            if self._add(e): fresh.append(e)
+        self.metrics.observe("cluster.pass", (time.perf_counter() - t0) * 1000)
+        return fresh
+
+    def _add(self, e):
+        shingles = title_shingles(e.title_lc)
+        if not shingles: return True
+        sig = minhash(shingles)
+        # Band b takes every bands-th slot, so a band never pairs a slot with the neighbour it borrowed from
+        keys = tuple((b, *sig[b::self.bands]) for b in range(self.bands))
+        # Buckets and stored shingles are strings and tuples of strings, never sets: CPython stops
+        # tracking such tuples, so the per-title state adds nothing to each full GC pass, which
+        # would otherwise walk 16+ containers per title and blow the pass budget on the Tk thread
+        candidates = set()
+        for k in keys:
+            bucket = self.buckets.get(k)
+            if bucket is None: self.buckets[k] = e.link
+            elif type(bucket) is str: candidates.add(bucket); self.buckets[k] = (bucket, e.link)
+            elif len(bucket) < CLUSTER_BUCKET_MAX: candidates.update(bucket); self.buckets[k] = bucket + (e.link,)
+        matched = []
+        for link in candidates:
+            other = self.sigs[link][0]
+            common = len(shingles.intersection(other))
+            if common >= self.threshold * (len(shingles) + len(other) - common): matched.append(link)
+        self.sigs[e.link] = (tuple(shingles), keys)
+        if not matched: return True
+        # Join the biggest story among the matches; a title bridging two stories merges them
+        stories = {self.cluster_of[link] for link in matched if link in self.cluster_of}
+        sid = max(stories, key=lambda i: len(self.members[i])) if stories else self._new_story()
+        self.version += 1
+        for link in matched + [e.link]:
+            old = self.cluster_of.get(link)
+            if old == sid: continue
+            for moved in self.members.pop(old, None) or (link,): self.cluster_of[moved] = sid; self.members[sid].add(moved)
+        return False
+
+    def _new_story(self):
+        self.next_id += 1; self.members[self.next_id] = set()
+        return self.next_id
+
+    def _remove(self, link):
+        _, keys = self.sigs.pop(link, (None, ()))
+        for k in keys:
+            bucket = self.buckets.get(k)
+            if bucket is None: continue
+            if type(bucket) is str:
+                if bucket == link: del self.buckets[k]
+                continue
+            rest = tuple(other for other in bucket if other != link)
+            self.buckets[k] = rest[0] if len(rest) == 1 else rest
+        sid = self.cluster_of.pop(link, None)
+        if sid is None: return
+        self.version += 1
+        rest = self.members[sid]; rest.discard(link)
+        if len(rest) < 2:
+            for other in rest: del self.cluster_of[other]
+            del self.members[sid]
+
+    def collapse(self, rows, expanded=(), pinned=()):
+        # rows newest first -> (rows with one card per story, {lead link: (story id, hidden copies)}).
+        # Each story stays where its newest row is and is led by its newest pinned copy, else
+        # its newest copy; the other copies are dropped, or listed right after the lead when
+        # the story id is in `expanded`.
+        if not self.cluster_of: return rows, {}
+        groups = {}
+        for e in rows:
+            sid = self.cluster_of.get(e.link)
+            if sid is not None: groups.setdefault(sid, []).append(e)
+        out, heads = [], {}
+        for e in rows:
+            sid = self.cluster_of.get(e.link)
+            if sid is None: out.append(e); continue
+            group = groups[sid]
+            if group[0] is not e: continue
+            lead = next((m for m in group if m.link in pinned), e) if pinned else e
+            out.append(lead)
+            if len(group) > 1:
+                heads[lead.link] = (sid, len(group) - 1)
+                if sid in expanded: out.extend(m for m in group if m is not lead)
+        return out, heads
+
+# --- PIPELINE ---
+CardModel = namedtuple("CardModel", "link title source summary pinned read copies expanded")
+
+class PinnedRows:
+    # Pinned-first view over rows in recency order, without copying or re-sorting them.
+    # `ranks` holds the sorted positions of the pinned rows; pinning or unpinning one entry
+    # is a single bisect, so the card list can be updated in place.
+    def __init__(self, rows, pinned, heads=None):
+        self.rows = rows
+        self.ranks = [i for i, e in enumerate(rows) if e.link in pinned]
+        self.heads = heads or {}  # lead link -> (story id, hidden copies), see StoryClusterer.collapse
+
+    def __len__(self): return len(self.rows)
+
+    def __getitem__(self, i):
+        if i < len(self.ranks): return self.rows[self.ranks[i]]
+        j = i - len(self.ranks)  # i-th row overall is the j-th unpinned one; skip pinned ranks at or before it
+        for r in self.ranks:
+            if r > j: break
+            j += 1
+        return self.rows[j]
+
+    def set_pinned(self, entry, pinned):
+        # Returns whether the order changed (False when entry is not in the view or already placed)
+        try: rank = self.rows.index(entry)
+        except ValueError: return False
+        pos = bisect.bisect_left(self.ranks, rank)
+        present = pos < len(self.ranks) and self.ranks[pos] == rank
+        if pinned == present: return False
+        if pinned: self.ranks.insert(pos, rank)
+        else: del self.ranks[pos]
+        return True
+
+def visible_entries(search_index, query, active_sources, pinned, clusterer=None, expanded=(), sources_of=None):
+    # filter -> source toggles -> one card per story -> pinned first (recency order is kept within each group).
+    # With sources_of (EntryStore.sources_of) an article stays visible while any source carrying it is on.
+    def shown(e):
+        if active_sources.get(e.src, True): return True
+        return sources_of is not None and any(active_sources.get(n, True) for n in sources_of(e))
+    rows = [e for e in search_index.search(query) if shown(e)]
+    rows, heads = clusterer.collapse(rows, expanded, pinned) if clusterer else (rows, {})
+    return PinnedRows(rows, pinned, heads)
+
+def archive_entries(archive, text, active_sources, pinned, limit=ARCHIVE_LIMIT):
+    # visible_entries over the on-disk archive; text may carry src:/since:/until: filters
+    query, sources, since, until = parse_archive_query(text)
+    return PinnedRows([e for e in archive.search(query, sources, since, until, limit) if active_sources.get(e.src, True)], pinned)
+
+def card_model(entry, pinned, read, copies=0, expanded=False):
+    return CardModel(entry.link, entry.title, entry.src, entry.summary[:100] + "...", entry.link in pinned, entry.link in read, copies, expanded)
+
+def parse_weather(title):
+    # Google News weather headlines carry the temperature and a 晴/曇/雨 hint
+    match = re.search(r'(\d+)\s*(?:°C|℃)', title)
+    temp = match.group(1) if match else "--"
+    cond = "☀️" if "晴" in title else "☁️" if "曇" in title else "🌧️" if "雨" in title else "⛅"
+    return f"{cond} {temp}°C"
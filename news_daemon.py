@@ -0,0 +1,330 @@
+# --- CORE_INTEL FETCH DAEMON ---
+# One headless process polls the feeds, weather and quotes, merges and archives for every
+# widget of this user; widgets subscribe over a local socket instead of each polling upstream.
+#   python news_daemon.py                 # Unix socket in DATA_DIR (localhost TCP on Windows)
+#   python news_widget.py                 # attaches when the daemon is running (--standalone: never)
+#
+# Protocol: one JSON object per line, UTF-8, both directions.
+#   widget -> daemon   {"type": "subscribe", "sources": [{"name", "url"}], "quotes": [{"name", "id"}], "token": token}
+#                      {"type": "refresh"}                        manual refresh of the subscribed sources
+#   daemon -> widget   {"type": "snapshot", "sources": {name: [entry]}, "errors": {name: error}, "quotes": {...}, "weather": text}
+#                      {"type": "source", "name": name, "entries": [entry], "error": error}
+#                          sent after every poll; "entries" only when the source's items changed
+#                      {"type": "quotes", "last": {id: [price, pct, fetched]}, "stale": [id]}
+#                      {"type": "weather", "text": text}
+# The daemon polls the union of what its subscribers asked for and pauses when none are subscribed.
+# Over TCP, which every local user can reach, "token" must match the DAEMON_TOKEN file the daemon
+# writes into its user's DATA_DIR; a Unix socket is already private to its user (mode 0600).
+import argparse
+import hmac
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import sys
+import threading
+import time
+
+from news_core import (
+    DAEMON_SOCKET, DAEMON_PORT, DAEMON_TOKEN, WEATHER_URL, QUOTE_INTERVAL_MS,
+    Metrics, FeedCache, FeedFetcher, PollScheduler, QuoteService, EntryStore, ArticleArchive, parse_weather,
+)
+
+WEATHER_INTERVAL = 1800   # s, as the widget's own weather task
+CONNECT_TIMEOUT = 0.5     # s a widget waits for the daemon before polling on its own
+OUTBOX_MAX = 1000         # messages queued per subscriber; one this far behind is dropped and must reconnect
+
+def default_address():
+    # Unix socket where the platform has them, otherwise localhost TCP
+    return DAEMON_SOCKET if hasattr(socket, "AF_UNIX") else ("127.0.0.1", DAEMON_PORT)
+
+def open_socket(address):
+    return socket.socket(socket.AF_UNIX if isinstance(address, str) else socket.AF_INET, socket.SOCK_STREAM)
+
+def encode(msg): return (json.dumps(msg, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def read_messages(sock):
+    # Yields decoded lines until the peer hangs up; a malformed line is skipped, not fatal
+    for line in sock.makefile("rb"):
+        try: msg = json.loads(line)
+        except ValueError: continue
+        if isinstance(msg, dict): yield msg
+
+def read_token(path=DAEMON_TOKEN):
+    try:
+        with open(path, encoding="utf-8") as f: return f.read().strip()
+    except OSError: return None
+
+def is_listening(address, timeout=CONNECT_TIMEOUT):
+    sock = open_socket(address); sock.settimeout(timeout)
+    try: sock.connect(address); return True
+    except OSError: return False
+    finally: sock.close()
+
+# --- DAEMON ---
+class Subscriber:
+    # One connected widget. Sends go through a bounded outbox drained by its own thread, so
+    # a stalled widget never blocks polling or the other subscribers.
+    def __init__(self, daemon, sock):
+        self.daemon, self.sock = daemon, sock
+        self.sources = {}  # name -> source dict it subscribed to
+        self.quotes = []
+        self.subscribed = False  # connected but not yet subscribed widgets do not count
+        self.outbox = queue.Queue(OUTBOX_MAX)
+        self.closed = False
+
+    def start(self):
+        threading.Thread(target=self._read_loop, name="subscriber-read", daemon=True).start()
+        threading.Thread(target=self._write_loop, name="subscriber-write", daemon=True).start()
+
+    def send(self, msg):
+        try: self.outbox.put_nowait(encode(msg))
+        except queue.Full: self.close()
+
+    def close(self):
+        if self.closed: return
+        self.closed = True
+        try: self.outbox.put_nowait(None)
+        except queue.Full: pass  # the writer is mid-send and fails on the shut-down socket instead
+        try: self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError: pass
+        self.sock.close(); self.daemon.drop(self)
+
+    def _read_loop(self):
+        try:
+            for msg in read_messages(self.sock): self.daemon.handle(self, msg)
+        except OSError: pass
+        except Exception as e: self.daemon.metrics.error("daemon", e)  # a bad message costs this subscriber only
+        self.close()
+
+    def _write_loop(self):
+        while True:
+            data = self.outbox.get()
+            if data is None or self.closed: return
+            try: self.sock.sendall(data)
+            except OSError: self.close(); return
+
+class NewsDaemon:
+    # Owns the only FeedFetcher / PollScheduler / QuoteService for every subscriber. Each
+    # poll result is merged into one EntryStore, archived once, and fanned out to the
+    # subscribers of that source. Sources are keyed by name; when two widgets disagree on a
+    # name's URL the latest subscription wins.
+    def __init__(self, address=None, cache=None, archive=None, metrics=None, token_path=DAEMON_TOKEN):
+        self.address = address or default_address()
+        self.token_path, self.token = token_path, None
+        self.metrics = metrics or Metrics()
+        self.fetcher = FeedFetcher(cache if cache is not None else FeedCache(), metrics=self.metrics)
+        self.poller = PollScheduler(self.fetcher, self.on_poll, metrics=self.metrics)
+        self.quotes = QuoteService(symbols=(), metrics=self.metrics)
+        self.archive = archive
+        self.store = EntryStore()
+        self.lock = threading.RLock()  # store, latest, errors and subscribers; also keeps each subscriber's messages in order
+        self.subscribers = set()
+        self.latest = {}  # source name -> entries from its last good poll
+        self.errors = {}  # source name -> error of its last poll
+        self.weather = None
+        self.active = threading.Event()  # set while anyone is connected; the quote/weather loop waits on it
+        self.wake = threading.Event()
+        self.quotes_due = self.weather_due = 0.0
+        self.server, self.running = None, False
+
+    def start(self):
+        sock = open_socket(self.address)
+        if isinstance(self.address, str):
+            # A socket file left behind by a daemon that died is replaced; a live one is not
+            if os.path.exists(self.address):
+                if is_listening(self.address): sock.close(); raise RuntimeError(f"already running on {self.address}")
+                os.unlink(self.address)
+            os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+        else: sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(self.address)
+        if isinstance(self.address, str): os.chmod(self.address, 0o600)  # this user's widgets only
+        else:
+            self.address = sock.getsockname()  # port 0 picks a free one
+            # Anyone on the machine can reach a TCP port; only this user can read the token
+            self.token = secrets.token_hex(16)
+            os.makedirs(os.path.dirname(self.token_path) or ".", exist_ok=True)
+            fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f: f.write(self.token)
+        sock.listen(socket.SOMAXCONN)
+        self.server, self.running = sock, True
+        self.poller.set_paused(True); self.poller.start()
+        threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True).start()
+        threading.Thread(target=self._refresh_loop, name="daemon-refresh", daemon=True).start()
+
+    def stop(self):
+        self.running = False; self.active.set(); self.wake.set()
+        self.poller.stop()
+        self.fetcher.pool.shutdown(wait=False, cancel_futures=True)  # in-flight fetches die with the process
+        self.quotes.worker.shutdown(wait=False, cancel_futures=True)
+        try: self.server.shutdown(socket.SHUT_RDWR)  # wakes the blocked accept()
+        except OSError: pass
+        self.server.close()
+        for path in (self.address if isinstance(self.address, str) else None, self.token_path if self.token else None):
+            if path is None: continue
+            try: os.unlink(path)
+            except OSError: pass
+        with self.lock: subs = list(self.subscribers)
+        for sub in subs: sub.close()
+        if self.archive: self.archive.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try: conn, _ = self.server.accept()
+            except OSError:
+                if self.running: time.sleep(0.1); continue
+                return
+            sub = Subscriber(self, conn)
+            with self.lock: self.subscribers.add(sub); self._reconfigure()
+            sub.start()
+
+    def drop(self, sub):
+        with self.lock:
+            if sub in self.subscribers: self.subscribers.discard(sub); self._reconfigure()
+
+    def handle(self, sub, msg):
+        kind = msg.get("type")
+        if kind == "subscribe":
+            if self.token and not hmac.compare_digest(str(msg.get("token") or ""), self.token):
+                sub.close(); return
+            with self.lock:
+                sub.subscribed = True
+                sub.sources = {s["name"]: s for s in msg.get("sources") or () if s.get("name") and s.get("url")}
+                sub.quotes = [q for q in msg.get("quotes") or () if q.get("id")]
+                self._reconfigure(); sub.send(self.snapshot(sub))
+        elif kind == "refresh" and sub.subscribed:
+            self.poller.poll_now(list(sub.sources))
+
+    def _reconfigure(self):
+        # Called under self.lock whenever a subscriber comes, goes or changes what it wants.
+        # Only subscribed widgets count: one that has just connected has asked for nothing yet.
+        subscribed = [sub for sub in self.subscribers if sub.subscribed]
+        if not subscribed:
+            # Nobody subscribed: stop polling but keep sources, schedules and items for the next subscriber
+            self.poller.set_paused(True); self.active.clear(); return
+        sources, quotes = {}, {}
+        for sub in subscribed:
+            sources.update(sub.sources)
+            for q in sub.quotes: quotes.setdefault(q["id"], q)
+        for name in [n for n in self.latest if n not in sources]:
+            self.latest.pop(name); self.store.merge({name: []})
+        for name in [n for n in self.errors if n not in sources]: self.errors.pop(name)
+        self.poller.set_sources(list(sources.values()))
+        if set(quotes) - {q["id"] for q in self.quotes.symbols}: self.quotes_due = 0.0; self.wake.set()
+        self.quotes.symbols = list(quotes.values())
+        self.poller.set_paused(False); self.active.set()
+
+    def snapshot(self, sub):
+        return {"type": "snapshot", "sources": {name: [e.to_dict() for e in self.latest[name]] for name in sub.sources if name in self.latest},
+                "errors": {name: err for name, err in self.errors.items() if name in sub.sources},
+                "quotes": self.quotes.dump(), "weather": self.weather}
+
+    def on_poll(self, name, entries, error):
+        # Fetch worker thread. Subscribers always hear that the poll settled (a manual refresh
+        # waits for that), but the items travel only when they differ from the last poll.
+        msg = {"type": "source", "name": name}
+        with self.lock:
+            if error: self.errors[name] = msg["error"] = error
+            else:
+                self.errors.pop(name, None)
+                prev = self.latest.get(name)
+                items = [e.to_dict() for e in entries]
+                if prev is not entries and (prev is None or [e.to_dict() for e in prev] != items):
+                    self.latest[name], msg["entries"] = entries, items
+                    delta = self.store.merge({name: entries})
+                    if self.archive: self.archive.add(delta.added + delta.updated)
+            for sub in list(self.subscribers):  # a full outbox drops its subscriber mid-loop
+                if name in sub.sources: sub.send(msg)
+
+    def broadcast(self, msg):
+        with self.lock:
+            for sub in [sub for sub in self.subscribers if sub.subscribed]: sub.send(msg)
+
+    def _refresh_loop(self):
+        # Quotes and weather on fixed intervals, only while anyone is subscribed
+        while self.running:
+            self.active.wait()
+            if not self.running: return
+            now = time.monotonic()
+            if now >= self.quotes_due:
+                self.quotes_due = now + QUOTE_INTERVAL_MS / 1000
+                if self.quotes.symbols: self.quotes.refresh(); self.broadcast({"type": "quotes", **self.quotes.dump()})
+            if now >= self.weather_due:
+                self.weather_due = now + WEATHER_INTERVAL
+                try:
+                    with self.metrics.timer("weather.fetch"): entries = self.fetcher.parse_url(WEATHER_URL, "weather")
+                    if entries: self.weather = parse_weather(entries[0].title)
+                except Exception as e: self.metrics.error("weather", e)
+                if self.weather: self.broadcast({"type": "weather", "text": self.weather})
+            self.wake.wait(max(0.0, min(self.quotes_due, self.weather_due) - time.monotonic())); self.wake.clear()
+
+# --- CLIENT ---
+class DaemonClient:
+    # Widget side of the protocol. on_message(msg) runs on the reader thread; when the
+    # daemon goes away it gets a final {"type": "closed"} (not after close() was called).
+    def __init__(self, address=None, on_message=None, timeout=CONNECT_TIMEOUT, token_path=DAEMON_TOKEN):
+        self.address, self.on_message, self.timeout = address or default_address(), on_message, timeout
+        self.token_path = token_path
+        self.sock, self.closed = None, False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        # False when nothing is listening, so the caller can poll on its own instead
+        sock = open_socket(self.address); sock.settimeout(self.timeout)
+        try: sock.connect(self.address)
+        except OSError: sock.close(); return False
+        sock.settimeout(None)
+        self.sock = sock
+        threading.Thread(target=self._read_loop, name="daemon-client", daemon=True).start()
+        return True
+
+    def subscribe(self, sources, quotes):
+        msg = {"type": "subscribe", "sources": sources, "quotes": quotes}
+        if not isinstance(self.address, str): msg["token"] = read_token(self.token_path)
+        self.send(msg)
+
+    def refresh(self): self.send({"type": "refresh"})
+
+    def send(self, msg):
+        try:
+            with self.lock: self.sock.sendall(encode(msg))
+        except OSError:  # the reader sees the hang-up too and reports it
+            try: self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError: pass
+
+    def close(self):
+        self.closed = True
+        if self.sock is None: return
+        try: self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError: pass
+        self.sock.close()
+
+    def _read_loop(self):
+        try:
+            for msg in read_messages(self.sock): self.on_message(msg)
+        except OSError: pass
+        if not self.closed: self.on_message({"type": "closed"})
+
+def main():
+    p = argparse.ArgumentParser(description="CORE_INTEL shared fetch daemon")
+    p.add_argument("--socket", help=f"Unix socket path (default {DAEMON_SOCKET})")
+    p.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a Unix socket")
+    p.add_argument("--no-archive", action="store_true", help="do not write the article archive")
+    args = p.parse_args()
+    metrics = Metrics()
+    address = ("127.0.0.1", args.port) if args.port is not None else args.socket or default_address()
+    daemon = NewsDaemon(address, archive=None if args.no_archive else ArticleArchive(metrics=metrics), metrics=metrics)
+    try: daemon.start()
+    except (OSError, RuntimeError) as e: print(f"news_daemon: {e}", file=sys.stderr); return 1
+    print(f"news_daemon: listening on {daemon.address}", file=sys.stderr, flush=True)
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt: pass
+    finally: daemon.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,27 @@
+import time
+PROCESS_START = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import feedparser
 import webbrowser
 from datetime import datetime
 import ctypes
 from ctypes import wintypes
-import re
-import psutil
+import sys
 import threading
-import time
 import json
 import os
-import winsound
 import random
-import urllib.request
+try:
+    import winsound
+except ImportError:  # non-Windows: the ping is skipped
+    winsound = None
+from news_core import (
+    DEFAULT_SOURCES, DEFAULT_QUOTES, WEATHER_URL, QUOTE_INTERVAL_MS, SETTINGS_FILE, SNAPSHOT_FILE, PERF_LOG, METRICS_FILE,
+    READ_HISTORY_MAX, READ_HISTORY_DAYS, PINNED_MAX, ARCHIVE_DAYS,
+    Metrics, LinkHistory, SettingsStore, FeedCache, FeedFetcher, PollScheduler, QuoteService, EntryStore, SearchIndex, ArticleArchive, StoryClusterer,
+    Entry, snapshot_entries, restore_entries, visible_entries, archive_entries, card_model, parse_weather,
+)
+from news_daemon import DaemonClient, default_address
 
 # --- HIGH DPI AWARENESS ---
 try:
@@ -38,16 +46,186 @@ CORE_THEME = {
     "border": "#30363d",
 }
 
-DEFAULT_SOURCES = [
-    {"name": "Reuters", "url": "https://news.google.com/rss/search?q=source:Reuters&hl=ja&gl=JP&ceid=JP:ja"},
-    {"name": "Bloomberg", "url": "https://news.google.com/rss/search?q=source:Bloomberg&hl=ja&gl=JP&ceid=JP:ja"}
-]
-
-SETTINGS_FILE = os.path.join(os.environ["LOCALAPPDATA"], "CyberNewsWidget_Settings.json")
-STARTUP_PATH = os.path.join(os.environ["APPDATA"], r"Microsoft\Windows\Start Menu\Programs\Startup", "CyberNewsWidget.vbs")
+CARD_HEIGHT = 84       # fixed row pitch of the virtual news list (px)
+CARD_OVERSCAN = 2      # rows kept rendered beyond each edge of the viewport
+SEARCH_DEBOUNCE_MS = 150
+RENDER_SLICE_MS = 8    # card-building budget per idle pass; the rest of the pool is built on later passes
+TICKER_FRAME_MS = 30        # target ticker frame interval; stretched under load
+TICKER_MAX_FRAME_MS = 120
+TICKER_PX_PER_MS = 1 / 30   # scroll speed, independent of the frame rate actually achieved
+CPU_SAMPLE_MS = 5000
+LOW_POWER_CPU_BUDGET = 1.0  # % of one core the whole process may use while in low-power mode
+SAVE_DEBOUNCE_MS = 2000
+PING_COOLDOWN_MS = 60000    # sources now land one by one; one ping covers a burst of them
+
+STARTUP_PATH = os.path.join(os.environ["APPDATA"], r"Microsoft\Windows\Start Menu\Programs\Startup", "CyberNewsWidget.vbs") if os.environ.get("APPDATA") else None
+
+# --- FRAME SCHEDULER ---
+class ScheduledTask:
+    __slots__ = ("name", "fn", "base", "interval", "max_interval", "priority", "factors", "adaptive", "enabled", "throttle", "job", "last", "lag")
+
+class FrameScheduler:
+    # Owns every periodic Tk callback. Each task has a base interval, a priority
+    # (0 essential .. 2 cosmetic) and per-mode multipliers, where None pauses it:
+    # "mini", "hidden" and "low_power" (visible is always 1x). Paused tasks resume
+    # immediately if they became overdue while paused.
+    def __init__(self, root, cpu_budget=LOW_POWER_CPU_BUDGET, metrics=None):
+        self.root = root
+        self.metrics = metrics or Metrics()
+        self.tasks = {}
+        self.mode, self.low_power = "visible", False
+        self.cpu_budget, self.cpu_pct = cpu_budget, 0.0
+        self._cpu_mark = (time.perf_counter(), time.process_time())
+        self.add("cpu_sample", self.sample_cpu, CPU_SAMPLE_MS, priority=0, hidden=1, low_power=1)
+
+    def add(self, name, fn, interval_ms, priority=1, mini=1, hidden=None, low_power=2, adaptive=False, max_interval=None, enabled=True):
+        t = ScheduledTask()
+        t.name, t.fn, t.base, t.interval, t.max_interval = name, fn, interval_ms, interval_ms, max_interval or interval_ms
+        t.priority, t.factors, t.adaptive, t.enabled = priority, {"visible": 1, "mini": mini, "hidden": hidden, "low_power": low_power}, adaptive, enabled
+        t.throttle, t.job, t.last, t.lag = 1, None, None, 0.0
+        self.tasks[name] = t; self._arm(t)
+
+    def interval_of(self, t):
+        factor = t.factors[self.mode]
+        if not t.enabled or factor is None: return None
+        if self.low_power:
+            if t.factors["low_power"] is None: return None
+            factor *= t.factors["low_power"]
+        return max(1, int(t.interval * factor * t.throttle))
+
+    def _arm(self, t):
+        if t.job is not None: self.root.after_cancel(t.job); t.job = None
+        iv = self.interval_of(t)
+        if iv is None: return
+        delay = 0 if t.last is None else max(0, int((t.last - time.perf_counter()) * 1000) + iv)
+        t.job = self.root.after(delay, self._run, t, time.perf_counter() + delay / 1000)
+
+    def _run(self, t, due):
+        t.job = None
+        t.last = now = time.perf_counter()
+        late = max(0.0, (now - due) * 1000)
+        t.lag = t.lag * 0.9 + late * 0.1  # EWMA of how late the callback fired
+        self.metrics.observe("loop.lag", late)
+        try: t.fn()
+        finally:
+            if t.adaptive: self._adapt(t)
+            if t.job is None: self._arm(t)
+
+    def _adapt(self, t):
+        # Late callbacks or a blown budget stretch the frame interval; a quiet loop earns it back
+        if t.lag > t.base * 0.5 or self.over_budget(): t.interval = min(t.max_interval, t.interval * 1.25)
+        elif t.lag < t.base * 0.1: t.interval = max(t.base, t.interval / 1.1)
+
+    def over_budget(self): return self.low_power and self.cpu_pct > self.cpu_budget
+
+    def sample_cpu(self):
+        now, cpu = time.perf_counter(), time.process_time()
+        wall = now - self._cpu_mark[0]
+        if wall > 0: self.cpu_pct = (cpu - self._cpu_mark[1]) / wall * 100
+        self._cpu_mark = (now, cpu)
+        # Over budget in low-power mode: halve the rate of cosmetic tasks until it fits, then relax
+        for t in self.tasks.values():
+            if t.priority < 2: continue
+            throttle = min(8, t.throttle * 2) if self.over_budget() else max(1, t.throttle / 2)
+            if throttle != t.throttle: t.throttle = throttle; self._arm(t)
+
+    def set_mode(self, mode):
+        if mode == self.mode: return
+        self.mode = mode; self.rearm()
+
+    def set_low_power(self, on):
+        self.low_power = on
+        for t in self.tasks.values(): t.throttle = 1
+        self.rearm()
+
+    def set_enabled(self, name, on):
+        t = self.tasks[name]; t.enabled = on; self._arm(t)
+
+    def rearm(self):
+        for t in self.tasks.values(): self._arm(t)
+
+# --- VIRTUAL NEWS LIST ---
+class CardSlot:
+    __slots__ = ("border", "card", "src", "count", "star", "title", "window", "entry", "state")
+
+class VirtualCardList:
+    # Only the rows inside the viewport (plus overscan) own widgets; a fixed pool of
+    # card slots is recycled as the canvas scrolls, so cost is independent of len(rows).
+    # Each slot remembers the state tuple it last displayed; binding is skipped when the
+    # state is unchanged and otherwise told the old state so it touches only what differs.
+    def __init__(self, canvas, make_slot, bind_slot, state_of, row_h=CARD_HEIGHT, overscan=CARD_OVERSCAN):
+        self.canvas, self.make_slot, self.bind_slot, self.state_of = canvas, make_slot, bind_slot, state_of
+        self.row_h, self.overscan = row_h, overscan
+        self.rows, self.pool, self.view, self.width = [], [], None, 420
+        self.by_link = {}  # link -> slot currently showing it
+        self.job = None  # after_idle id of the next slice while the pool is still being built
+        self.empty = canvas.create_text(210, 30, text="NO DATA", fill=CORE_THEME["text_dim"], state="hidden")
+        # yscrollcommand fires on every view change: wheel, cinema-mode yview_scroll, moveto, resize
+        canvas.configure(yscrollcommand=lambda *a: self.render())
+        canvas.bind("<Configure>", lambda e: self.render())
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.canvas.configure(scrollregion=(0, 0, self.width, max(1, len(rows) * self.row_h)))
+        self.canvas.itemconfig(self.empty, state="hidden" if rows else "normal")
+        self.render(force=True)
+
+    def set_width(self, width):
+        if width == self.width: return
+        self.width = width
+        self.canvas.configure(scrollregion=(0, 0, width, max(1, len(self.rows) * self.row_h)))
+        self.canvas.coords(self.empty, width // 2, 30)
+        for slot in self.pool: self.canvas.itemconfig(slot.window, width=width - 10)
+
+    def render(self, force=False):
+        top, height = self.canvas.canvasy(0), max(self.canvas.winfo_height(), self.row_h)
+        first = max(0, int(top // self.row_h) - self.overscan)
+        last = min(len(self.rows), int((top + height) // self.row_h) + 1 + self.overscan)
+        if not force and self.view == (first, last) and len(self.pool) >= last - first: return
+        self.view = (first, last)
+        # Building a card costs a few ms, so a cold start or a tall resize builds what fits in one
+        # slice, shows the top rows with it and finishes on later idle passes; input runs in between.
+        deadline = time.perf_counter() + RENDER_SLICE_MS / 1000
+        while len(self.pool) < last - first and (not self.pool or time.perf_counter() < deadline):
+            slot = self.make_slot()
+            slot.entry = slot.state = None
+            slot.window = self.canvas.create_window(5, -2 * self.row_h, window=slot.border, anchor="nw", width=self.width - 10, height=self.row_h - 8)
+            self.pool.append(slot)
+        if len(self.pool) < last - first:
+            last = first + len(self.pool)
+            if self.job is None: self.job = self.canvas.after_idle(self._resume)
+        # Row i always lands in slot i % pool size, so a row that stays visible keeps its widgets
+        used = set()
+        for idx in range(first, last):
+            slot, row = self.pool[idx % len(self.pool)], self.rows[idx]; used.add(idx % len(self.pool))
+            if slot.entry is not row:
+                if slot.entry is not None and self.by_link.get(slot.entry.link) is slot: del self.by_link[slot.entry.link]
+                slot.entry = row; self.by_link[row.link] = slot; self._bind(slot)
+            elif force: self._bind(slot)
+            self.canvas.coords(slot.window, 5, idx * self.row_h + 4)
+        for i, slot in enumerate(self.pool):
+            if i not in used and slot.entry is not None:
+                if self.by_link.get(slot.entry.link) is slot: del self.by_link[slot.entry.link]
+                slot.entry = None; self.canvas.coords(slot.window, 5, -2 * self.row_h)
+
+    def _bind(self, slot):
+        state = self.state_of(slot.entry)
+        if state != slot.state: old, slot.state = slot.state, state; self.bind_slot(slot, state, old)
+
+    def update(self, link):
+        # One entry's pin/read state changed: rebinds its card if it is on screen, nothing else
+        slot = self.by_link.get(link)
+        if slot is not None: self._bind(slot)
+
+    def reconcile(self):
+        # Theme or other global state changed: restyles the visible cards in place
+        for slot in self.pool:
+            if slot.entry is not None: self._bind(slot)
+
+    def _resume(self): self.job = None; self.render()
 
 class CyberNewsWidget:
-    def __init__(self, root):
+    def __init__(self, root, settings_path=SETTINGS_FILE, warm_start=True, daemon_address=None):
         self.root = root
         self.root.overrideredirect(True)
         self.root.attributes("-topmost", True)
@@ -66,10 +244,35 @@ class CyberNewsWidget:
         self.sources = list(DEFAULT_SOURCES)
         self.active_sources = {s["name"]: True for s in self.sources}
         self.all_entries = []
-        self.pinned_links = set()
-        self.read_links = set()
+        self.store = EntryStore()
+        self.search_index = SearchIndex()
+        self._search_job = None
+        self.expanded = set()  # story ids whose duplicate cards are shown
+        self._cluster_job = None
+        self.source_errors = {}
+        self._render_job = None
+        self._sync = None  # {"pending", "total", "started"} while a manual refresh is streaming in
+        self._last_ping = None
+        self.metrics = Metrics()
+        self.fetcher = FeedFetcher(FeedCache(), metrics=self.metrics)
+        self.poller = PollScheduler(self.fetcher, lambda name, entries, error: self.root.after(0, lambda: self.merge_source(name, entries, error)), metrics=self.metrics)
+        self.quotes = QuoteService(metrics=self.metrics)
+        self.archive = ArticleArchive(metrics=self.metrics)
+        self.clusterer = StoryClusterer(metrics=self.metrics)
+        self.archive_mode = False  # search box queries the on-disk archive instead of the live list
+        self.daemon_address = daemon_address
+        self.daemon = None  # DaemonClient while a news_daemon does the fetching for this window
+        self.pinned_links = LinkHistory(max_items=PINNED_MAX)
+        self.read_links = LinkHistory(max_items=READ_HISTORY_MAX, max_age_days=READ_HISTORY_DAYS)
+        self.settings = SettingsStore(settings_path, metrics=self.metrics)
+        self.snapshot = SettingsStore(SNAPSHOT_FILE, metrics=self.metrics)
+        self.warm_start = warm_start
+        self._save_job = None
         self.weather_info = "☀️ --°C"
         self.hidden = False
+        self.iconified = False
+        self.scheduler = FrameScheduler(root, metrics=self.metrics)
+        self._ticker_t, self._ticker_carry = time.perf_counter(), 0.0
         
         self.load_settings()
         
@@ -79,7 +282,7 @@ class CyberNewsWidget:
         self.root.geometry(f"{self.current_w}x{self.current_h}+{sw-self.current_w-40}+{sh-self.current_h-120}")
 
         self.search_query = tk.StringVar()
-        self.search_query.trace_add("write", lambda *args: self.refresh_display())
+        self.search_query.trace_add("write", self.on_search_changed)
         
         self.themed_labels = []
         self.themed_frames = []
@@ -87,47 +290,126 @@ class CyberNewsWidget:
         self.setup_ui()
         self.setup_context_menu()
         self.setup_hotkeys()
-        self.update_clock()
-        self.update_sys_stats()
-        self.update_weather()
-        self.start_ticker()
-        self.fetch_data()
-        self.run_cinema_mode()
+        self.scheduler.add("clock", self.update_clock, 1000, priority=0)
+        if self.warm_start: self.restore_snapshot()
+        self.scheduler.add("ticker", self.animate_ticker, TICKER_FRAME_MS, priority=2, mini=None, low_power=3, adaptive=True, max_interval=TICKER_MAX_FRAME_MS)
+        self.scheduler.add("cinema", self.run_cinema_mode, 800, priority=2, mini=None, low_power=1, enabled=self.cinema_mode)
+        self.scheduler.add("debug_overlay", self.update_debug_overlay, 1000, priority=2, mini=None, enabled=False)
         
         # Scroll binding
         self.root.bind_all("<MouseWheel>", self._on_mousewheel)
         self.root.bind("<Configure>", self.on_window_resize)
+        self.root.bind("<Map>", lambda e: e.widget is self.root and self.set_iconified(False))
+        self.root.bind("<Unmap>", lambda e: e.widget is self.root and self.set_iconified(True))
+
+        # Network work starts only once the first frame is on screen
+        self.root.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        self.root.update_idletasks()
+        ms = (time.perf_counter() - PROCESS_START) * 1000
+        self.status_lbl.config(text=f"READY IN {ms:.0f}ms // HUB_SYNCING...")
+        self.metrics.observe("startup.first_paint", ms)
+        try:
+            with open(PERF_LOG, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"event": "first_paint", "ts": round(time.time(), 3), "ms": round(ms, 1), "warm": self.warm_start, "entries": len(self.store)}) + "\n")
+        except OSError as e: self.metrics.error("perf_log", e)
+        self.scheduler.add("sys_stats", self.update_sys_stats, 2000, low_power=5)
+        if not self.attach_daemon(): self.start_polling()
+
+    def start_polling(self):
+        # Standalone: this window fetches feeds, weather and quotes itself
+        self.scheduler.add("weather", self.update_weather, 1800000)
+        self.scheduler.add("quotes", self.refresh_ticker, QUOTE_INTERVAL_MS, mini=None)
+        self.update_poll_sources(); self.fetch_data(); self.poller.start()
+
+    def attach_daemon(self):
+        # Thin subscriber: a running news_daemon polls upstream once for every window; this one
+        # only merges what it publishes. Its snapshot answers the first sync, so no refresh is forced.
+        if self.daemon_address is None: return False
+        client = DaemonClient(self.daemon_address, lambda msg: self.root.after(0, lambda: self.on_daemon_message(msg)))
+        if not client.connect(): return False
+        self.daemon = client; self.update_poll_sources()
+        self.status_lbl.config(text="HUB_SYNCING... // DAEMON")
+        return True
+
+    def on_daemon_message(self, msg):
+        kind = msg.get("type")
+        if kind == "source":
+            entries = msg.get("entries")
+            self.merge_source(msg["name"], None if entries is None else [Entry.from_dict(d) for d in entries], msg.get("error"))
+        elif kind == "snapshot":
+            self.update_data({name: [Entry.from_dict(d) for d in items] for name, items in msg["sources"].items()}, msg.get("errors"))
+            self.show_quotes(msg["quotes"])
+            if msg.get("weather"): self.weather_info = msg["weather"]; self.lbl_weather.config(text=self.weather_info)
+        elif kind == "quotes": self.show_quotes(msg)
+        elif kind == "weather": self.weather_info = msg["text"]; self.lbl_weather.config(text=self.weather_info)
+        elif kind == "closed" and self.daemon is not None:
+            # The daemon went away: carry on polling from this window
+            self.daemon = None; self.status_lbl.config(text="DAEMON LOST // HUB_SYNCING..."); self.start_polling()
+
+    def show_quotes(self, data):
+        self.quotes.load(data); self.ticker_canvas.itemconfig(self.ticker_text, text=self.quotes.ticker_text())
+
+    def restore_snapshot(self):
+        data = self.snapshot.load()
+        if data.get("entries"):
+            self.store.merge(restore_entries(data["entries"]))
+            self.all_entries = self.store.entries(); self.search_index.update(self.all_entries)
+            self.clusterer.update(self.all_entries); self.refresh_display(); self.schedule_clustering()
+        if data.get("ticker"): self.ticker_canvas.itemconfig(self.ticker_text, text=data["ticker"])
+        if data.get("weather"): self.weather_info = data["weather"]; self.lbl_weather.config(text=self.weather_info)
+
+    def save_snapshot(self):
+        self.snapshot.save({"saved": round(time.time()), "entries": snapshot_entries(self.store),
+                            "ticker": self.ticker_canvas.itemcget(self.ticker_text, "text"), "weather": self.weather_info})
 
     def load_settings(self):
-        if os.path.exists(SETTINGS_FILE):
-            try:
-                with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.memo_text = data.get("memo", self.memo_text)
-                    self.theme_idx = data.get("theme_idx", 0)
-                    self.pinned_links = set(data.get("pinned", []))
-                    self.read_links = set(data.get("read", []))
-                    self.sound_enabled = data.get("sound", True)
-                    saved_sources = data.get("sources")
-                    if saved_sources: self.sources = saved_sources
-                    active = data.get("active_sources")
-                    if active: self.active_sources = active
-            except: pass
+        data = self.settings.load()
+        self.memo_text = data.get("memo", self.memo_text)
+        self.theme_idx = data.get("theme_idx", 0)
+        self.pinned_links = LinkHistory(data.get("pinned", []), max_items=PINNED_MAX)
+        self.read_links = LinkHistory(data.get("read", []), max_items=READ_HISTORY_MAX, max_age_days=READ_HISTORY_DAYS)
+        self.sound_enabled = data.get("sound", True)
+        saved_sources = data.get("sources")
+        if saved_sources: self.sources = saved_sources
+        active = data.get("active_sources")
+        if active: self.active_sources = active
+        self.quotes.symbols = data.get("quotes") or list(DEFAULT_QUOTES)
+        self.scheduler.set_low_power(data.get("low_power", False))
+        self.archive.retention_days = data.get("archive_days", ARCHIVE_DAYS)
+
+    def settings_snapshot(self):
+        return {
+            "memo": self.memo_text,
+            "theme_idx": self.theme_idx,
+            "pinned": self.pinned_links.dump(),
+            "read": self.read_links.dump(),
+            "sound": self.sound_enabled,
+            "sources": self.sources,
+            "active_sources": self.active_sources,
+            "quotes": self.quotes.symbols,
+            "low_power": self.scheduler.low_power,
+            "archive_days": self.archive.retention_days
+        }
 
     def save_settings(self):
-        try:
-            data = {
-                "memo": self.memo_text,
-                "theme_idx": self.theme_idx,
-                "pinned": list(self.pinned_links),
-                "read": list(self.read_links),
-                "sound": self.sound_enabled,
-                "sources": self.sources,
-                "active_sources": self.active_sources
-            }
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-        except: pass
+        # Coalesced: the first change arms one write, later changes in the window ride along
+        if self._save_job is None: self._save_job = self.root.after(SAVE_DEBOUNCE_MS, self.flush_settings)
+
+    def flush_settings(self):
+        self._save_job = None
+        self.settings.save_async(self.settings_snapshot())
+
+    def close(self):
+        if self._save_job is not None: self.root.after_cancel(self._save_job); self._save_job = None
+        self.poller.stop(); self.archive.close()
+        self.fetcher.pool.shutdown(wait=False, cancel_futures=True)  # a stalled fetch must not outlive the window
+        self.quotes.worker.shutdown(wait=False, cancel_futures=True)
+        if self.daemon: self.daemon.close()
+        try: self.settings.flush(self.settings_snapshot()); self.save_snapshot()
+        except OSError as e: self.metrics.error("settings", e)
+        self.root.destroy()
 
     def setup_ui(self):
         self.main_container = tk.Frame(self.root, bg=CORE_THEME["border"], padx=1, pady=1)
@@ -170,7 +452,7 @@ class CyberNewsWidget:
         
         self.btn_exit = tk.Label(self.header, text="✕", fg=CORE_THEME["text_dim"], bg=CORE_THEME["bg_main"], font=("Segoe UI Symbol", 10), cursor="hand2")
         self.btn_exit.pack(side="right", padx=12)
-        self.btn_exit.bind("<Button-1>", lambda e: self.root.destroy())
+        self.btn_exit.bind("<Button-1>", lambda e: self.close())
 
         self.body_frame = tk.Frame(self.inner_frame, bg=CORE_THEME["bg_main"])
         self.body_frame.pack(fill="both", expand=True)
@@ -191,6 +473,8 @@ class CyberNewsWidget:
         self.search_entry = tk.Entry(search_inner, textvariable=self.search_query, bg=CORE_THEME["bg_card"], fg=CORE_THEME["text_main"],
                                      insertbackground=THEMES[self.theme_idx]["accent"], borderwidth=0, font=("Meiryo UI", 9), highlightthickness=0)
         self.search_entry.pack(side="left", fill="x", expand=True, padx=5)
+        self.archive_btn = tk.Label(search_inner, text="🗄", bg=CORE_THEME["bg_card"], fg=CORE_THEME["text_dim"], cursor="hand2", font=("Segoe UI Emoji", 9))
+        self.archive_btn.pack(side="right"); self.archive_btn.bind("<Button-1>", lambda e: self.toggle_archive_mode())
 
         # Source buttons
         self.toggle_frame = tk.Frame(self.body_frame, bg=CORE_THEME["bg_main"], padx=10)
@@ -201,9 +485,7 @@ class CyberNewsWidget:
         self.content_container = tk.Frame(self.body_frame, bg=CORE_THEME["bg_main"])
         self.content_container.pack(fill="both", expand=True, padx=10, pady=5)
         self.canvas = tk.Canvas(self.content_container, bg=CORE_THEME["bg_main"], highlightthickness=0)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=CORE_THEME["bg_main"])
-        self.scroll_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw", width=420)
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.news_list = VirtualCardList(self.canvas, self.create_card, self.bind_card, self.card_state)
         self.canvas.pack(side="left", fill="both", expand=True)
         
         # Ticker
@@ -211,7 +493,7 @@ class CyberNewsWidget:
         self.ticker_frame.pack(fill="x", side="bottom")
         self.ticker_canvas = tk.Canvas(self.ticker_frame, bg=CORE_THEME["bg_card"], height=25, highlightthickness=0)
         self.ticker_canvas.pack(fill="both", expand=True)
-        self.ticker_text = self.ticker_canvas.create_text(440, 12, text="", fill=THEMES[self.theme_idx]["accent"], font=("Meiryo UI", 8, "bold"), anchor="w")
+        self.ticker_text = self.ticker_canvas.create_text(440, 12, text="MARKET_SYNCING... ◆ ", fill=THEMES[self.theme_idx]["accent"], font=("Meiryo UI", 8, "bold"), anchor="w")
 
         # Status
         footer = tk.Frame(self.body_frame, bg=CORE_THEME["bg_main"], height=20)
@@ -219,6 +501,11 @@ class CyberNewsWidget:
         self.status_lbl = tk.Label(footer, text="HUB_READY", fg=CORE_THEME["text_dim"], bg=CORE_THEME["bg_main"], font=("Meiryo UI", 8), anchor="w")
         self.status_lbl.pack(side="left", fill="x", padx=12, expand=True)
 
+        # Debug overlay (context menu), filled from self.metrics while shown
+        self.debug_lbl = tk.Label(self.body_frame, text="", fg=THEMES[self.theme_idx]["accent"], bg=CORE_THEME["bg_card"], font=("Consolas", 7),
+                                  anchor="nw", justify="left", padx=6, pady=4)
+        self.themed_labels.append(self.debug_lbl)
+
         self.resizer = tk.Label(self.inner_frame, text="◢", fg=CORE_THEME["border"], bg=CORE_THEME["bg_main"], cursor="size_nw_se")
         self.resizer.place(relx=1.0, rely=1.0, anchor="se")
         self.resizer.bind("<ButtonPress-1>", self.start_resize)
@@ -228,7 +515,9 @@ class CyberNewsWidget:
         for w in self.toggle_frame.winfo_children(): w.destroy()
         accent = THEMES[self.theme_idx]["accent"]
         for src in self.sources:
-            btn = tk.Label(self.toggle_frame, text=f" {src['name']} ", fg=CORE_THEME["bg_main"], bg=accent if self.active_sources.get(src['name'], True) else CORE_THEME["border"], 
+            # Failed sources stay toggleable but are flagged red until their next successful fetch
+            bg = (CORE_THEME["accent_red"] if src['name'] in self.source_errors else accent) if self.active_sources.get(src['name'], True) else CORE_THEME["border"]
+            btn = tk.Label(self.toggle_frame, text=f" {src['name']} ", fg=CORE_THEME["bg_main"], bg=bg, 
                           font=("Meiryo UI", 7, "bold"), cursor="hand2", padx=5)
             btn.pack(side="left", padx=(0, 5), pady=2)
             btn.bind("<Button-1>", lambda e, s=src['name']: self.toggle_source(s))
@@ -240,10 +529,15 @@ class CyberNewsWidget:
         self.menu.add_command(label="🖼️ Toggle Overlay", command=self.toggle_overlay)
         self.menu.add_command(label="🎥 Cinema Mode", command=self.toggle_cinema)
         self.menu.add_command(label="🔊 Toggle Sound", command=self.toggle_sound)
+        self.menu.add_command(label="🔋 Low Power", command=self.toggle_low_power)
         self.menu.add_command(label="🚀 Auto-Startup", command=self.toggle_startup)
         self.menu.add_command(label="➕ Add RSS", command=self.add_custom_source)
+        self.menu.add_command(label="🗄 Archive Search", command=self.toggle_archive_mode)
+        self.menu.add_command(label="📊 Debug Overlay", command=self.toggle_debug_overlay)
+        self.menu.add_command(label="💾 Export Metrics", command=self.export_metrics)
+        self.menu.add_command(label="💹 Ticker Symbols", command=self.edit_quote_symbols)
         self.menu.add_separator()
-        self.menu.add_command(label="✕ Close", command=self.root.destroy)
+        self.menu.add_command(label="✕ Close", command=self.close)
         self.root.bind("<Button-3>", lambda e: self.menu.post(e.x_root, e.y_root))
 
     def setup_hotkeys(self):
@@ -265,6 +559,23 @@ class CyberNewsWidget:
     def toggle_visibility(self):
         if self.hidden: self.root.deiconify(); self.root.attributes("-topmost", True); self.hidden = False
         else: self.root.withdraw(); self.hidden = True
+        self.update_schedule_mode()
+
+    def set_iconified(self, iconified): self.iconified = iconified; self.update_schedule_mode()
+
+    def update_schedule_mode(self):
+        self.scheduler.set_mode("hidden" if self.hidden or self.iconified else "mini" if self.is_mini else "visible")
+
+    def toggle_low_power(self):
+        self.scheduler.set_low_power(not self.scheduler.low_power)
+        self.status_lbl.config(text=f"LOW POWER: {'ON' if self.scheduler.low_power else 'OFF'} // CPU {self.scheduler.cpu_pct:.1f}%")
+        self.save_settings()
+
+    def toggle_archive_mode(self):
+        self.archive_mode = not self.archive_mode
+        self.archive_btn.config(fg=THEMES[self.theme_idx]["accent"] if self.archive_mode else CORE_THEME["text_dim"])
+        self.status_lbl.config(text="ARCHIVE: word src:NAME since:7d until:YYYY-MM-DD" if self.archive_mode else "ARCHIVE: OFF")
+        self.refresh_display()
 
     def toggle_sound(self):
         self.sound_enabled = not self.sound_enabled
@@ -272,6 +583,7 @@ class CyberNewsWidget:
         self.save_settings()
 
     def toggle_startup(self):
+        if STARTUP_PATH is None: self.status_lbl.config(text="STARTUP: WINDOWS ONLY"); return
         if os.path.exists(STARTUP_PATH): os.remove(STARTUP_PATH); messagebox.showinfo("Startup", "Removed.")
         else:
             try:
@@ -281,7 +593,7 @@ class CyberNewsWidget:
             except: pass
 
     def play_ping(self):
-        if self.sound_enabled: threading.Thread(target=lambda: winsound.Beep(2000, 50), daemon=True).start()
+        if self.sound_enabled and winsound: threading.Thread(target=lambda: winsound.Beep(2000, 50), daemon=True).start()
 
     def _on_mousewheel(self, event):
         curr = event.widget
@@ -300,79 +612,79 @@ class CyberNewsWidget:
 
     def update_sys_stats(self):
         try:
+            import psutil  # deferred until after first paint
             c, r = psutil.cpu_percent(), psutil.virtual_memory().percent
             self.cpu_fill.place_configure(width=int(30 * c / 100)); self.ram_fill.place_configure(width=int(30 * r / 100))
-        except: pass
-        self.root.after(2000, self.update_sys_stats)
+        except Exception as e: self.metrics.error("sys_stats", e)
 
     def update_weather(self):
-        try:
-            # Simple Weather Fetch from Google News Weather RSS
-            f = feedparser.parse("https://news.google.com/rss/search?q=weather+tokyo&hl=ja&gl=JP&ceid=JP:ja")
-            if f.entries: 
-                match = re.search(r'(\d+)\s*(?:°C|℃)', f.entries[0].title)
-                temp = match.group(1) if match else "--"
-                cond = "☀️" if "晴" in f.entries[0].title else "☁️" if "曇" in f.entries[0].title else "🌧️" if "雨" in f.entries[0].title else "⛅"
-                self.weather_info = f"{cond} {temp}°C"
-        except: pass
-        self.lbl_weather.config(text=self.weather_info); self.root.after(1800000, self.update_weather)
+        def task():
+            try:
+                # Simple Weather Fetch from Google News Weather RSS
+                with self.metrics.timer("weather.fetch"): entries = self.fetcher.parse_url(WEATHER_URL, "weather")
+                if entries: self.weather_info = parse_weather(entries[0].title)
+            except Exception as e: self.metrics.error("weather", e)
+            self.root.after(0, lambda: self.lbl_weather.config(text=self.weather_info))
+        self.fetcher.pool.submit(task)
 
     def update_clock(self):
-        self.lbl_clock.config(text=datetime.now().strftime("%H:%M")); self.root.after(1000, self.update_clock)
+        self.lbl_clock.config(text=datetime.now().strftime("%H:%M"))
 
-    def start_ticker(self):
-        def update_trend():
-            try:
-                # Real-time Market Data via Yahoo Finance RSS (simple way without heavy libs)
-                items = [
-                    {"name": "NIKKEI", "id": "^N225"}, {"name": "DOW", "id": "^DJI"},
-                    {"name": "NASDAQ", "id": "^IXIC"}, {"name": "USD/JPY", "id": "USDJPY=X"}
-                ]
-                results = []
-                for item in items:
-                    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{item['id']}?interval=1m&range=1d"
-                    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    with urllib.request.urlopen(req) as response:
-                        data = json.loads(response.read().decode())
-                        price = data['chart']['result'][0]['meta']['regularMarketPrice']
-                        pre_close = data['chart']['result'][0]['meta']['previousClose']
-                        diff = price - pre_close
-                        pct = (diff / pre_close) * 100
-                        trend = "📈" if diff >= 0 else "📉"
-                        results.append(f"{item['name']}: {price:,.1f} ({pct:+.2f}%) {trend}")
-                txt = " ◆ ".join(results) + " ◆ "
-                self.ticker_canvas.itemconfig(self.ticker_text, text=txt)
-            except: 
-                self.ticker_canvas.itemconfig(self.ticker_text, text="MARKET_SYNCING... ◆ ")
-            self.root.after(60000, update_trend)
-        
-        update_trend(); self.animate_ticker()
+    def refresh_ticker(self):
+        # Network work happens on the quote worker; only the text swap runs on the Tk thread
+        self.quotes.refresh_async(lambda txt: self.root.after(0, lambda: self.ticker_canvas.itemconfig(self.ticker_text, text=txt)))
+
+    def edit_quote_symbols(self):
+        cur = ", ".join(f"{s['name']}={s['id']}" for s in self.quotes.symbols)
+        v = simpledialog.askstring("Ticker", "NAME=SYMBOL, ... (Yahoo chart symbols):", initialvalue=cur)
+        if v is None: return
+        syms = [{"name": n.strip(), "id": i.strip()} for n, _, i in (p.partition("=") for p in v.split(",")) if n.strip() and i.strip()]
+        self.quotes.symbols = syms or list(DEFAULT_QUOTES); self.save_settings()
+        if self.daemon: self.update_poll_sources()
+        else: self.refresh_ticker()
 
     def animate_ticker(self):
-        self.ticker_canvas.move(self.ticker_text, -1, 0)
+        # Distance follows elapsed time, so a throttled frame rate does not slow the scroll; capped after pauses
+        now = time.perf_counter()
+        self._ticker_carry += min(now - self._ticker_t, 0.25) * 1000 * TICKER_PX_PER_MS; self._ticker_t = now
+        dx = int(self._ticker_carry); self._ticker_carry -= dx
+        if dx: self.ticker_canvas.move(self.ticker_text, -dx, 0)
         if self.ticker_canvas.coords(self.ticker_text)[0] < -1200: self.ticker_canvas.coords(self.ticker_text, 440, 12)
-        self.root.after(30, self.animate_ticker)
 
     def toggle_overlay(self):
         self.overlay_mode = not self.overlay_mode
         if self.overlay_mode: self.main_container.config(padx=0, pady=0, bg=CORE_THEME["bg_main"]); self.resizer.place_forget()
         else: self.main_container.config(padx=1, pady=1, bg=CORE_THEME["border"]); self.resizer.place(relx=1.0, rely=1.0, anchor="se")
 
+    def toggle_debug_overlay(self):
+        on = not self.scheduler.tasks["debug_overlay"].enabled
+        if on: self.debug_lbl.place(relx=0, rely=0, relwidth=1); self.debug_lbl.lift()
+        else: self.debug_lbl.place_forget()
+        self.scheduler.set_enabled("debug_overlay", on)
+
+    def update_debug_overlay(self):
+        lines = [f"CPU {self.scheduler.cpu_pct:4.1f}%  MODE {self.scheduler.mode}{' +LOW_POWER' if self.scheduler.low_power else ''}  "
+                 f"TICKER {self.scheduler.tasks['ticker'].interval:.0f}ms  ENTRIES {len(self.store)}  CARDS {len(self.news_list.pool)}"]
+        self.debug_lbl.config(text="\n".join(lines + self.metrics.summary_lines()))
+
+    def export_metrics(self):
+        try: n = self.metrics.export_jsonl(METRICS_FILE); self.status_lbl.config(text=f"METRICS: {n} EVENTS -> {os.path.basename(METRICS_FILE)}")
+        except OSError as e: self.metrics.error("export", e); self.status_lbl.config(text="METRICS: EXPORT FAILED")
+
     def toggle_cinema(self):
         self.cinema_mode = not self.cinema_mode; self.status_lbl.config(text=f"CINEMA: {'ON' if self.cinema_mode else 'OFF'}")
+        self.scheduler.set_enabled("cinema", self.cinema_mode)
 
     def run_cinema_mode(self):
-        if self.cinema_mode and not self.is_mini:
-            self.canvas.yview_scroll(1, "units")
-            if self.canvas.yview()[1] >= 1.0: self.canvas.yview_moveto(0)
-        self.root.after(800, self.run_cinema_mode)
+        self.canvas.yview_scroll(1, "units")
+        if self.canvas.yview()[1] >= 1.0: self.canvas.yview_moveto(0)
 
     def add_custom_source(self):
         n = simpledialog.askstring("Add", "Name:"); u = simpledialog.askstring("Add", "RSS URL:")
-        if n and u: self.sources.append({"name": n, "url": u}); self.active_sources[n]=True; self.render_source_btns(); self.fetch_data(); self.save_settings()
+        if n and u: self.sources.append({"name": n, "url": u}); self.active_sources[n]=True; self.render_source_btns(); self.update_poll_sources(); self.save_settings()
 
     def toggle_source(self, name):
-        self.active_sources[name] = not self.active_sources[name]; self.render_source_btns(); self.refresh_display(); self.save_settings()
+        self.active_sources[name] = not self.active_sources[name]; self.render_source_btns(); self.refresh_display(); self.update_poll_sources(); self.save_settings()
 
     def cycle_theme(self):
         self.theme_idx = (self.theme_idx + 1) % len(THEMES); accent = THEMES[self.theme_idx]["accent"]
@@ -380,52 +692,139 @@ class CyberNewsWidget:
             try: lbl.config(fg=accent) 
             except: pass
         for frm in self.themed_frames: frm.config(bg=accent)
-        self.search_entry.config(insertbackground=accent); self.render_source_btns(); self.refresh_display(); self.save_settings()
+        if self.archive_mode: self.archive_btn.config(fg=accent)
+        self.search_entry.config(insertbackground=accent); self.render_source_btns(); self.news_list.reconcile(); self.save_settings()
+
+    def update_poll_sources(self):
+        # Only active sources are polled; a newly added or re-enabled one is fetched right away.
+        # Attached to a daemon, the subscription (sources and ticker symbols) is sent instead.
+        active = [src for src in self.sources if self.active_sources.get(src['name'], True)]
+        if self.daemon: self.daemon.subscribe(active, self.quotes.symbols)
+        else: self.poller.set_sources(active)
+        if self._sync:
+            self._sync["pending"] &= {src['name'] for src in self.sources if self.active_sources.get(src['name'], True)}
+            if not self._sync["pending"]: self._sync = None; self.show_sync_status()
 
     def fetch_data(self):
+        # Refresh Hub: pulls every active source's next poll forward instead of starting another timer chain
+        if self.daemon: self.daemon.refresh(); names = [src['name'] for src in self.sources if self.active_sources.get(src['name'], True)]
+        else: names = self.poller.poll_now()
+        if not names: return
         self.status_lbl.config(text="HUB_SYNCING...")
-        def task():
-            entries = []
-            for src in self.sources:
-                if self.active_sources.get(src['name'], True):
-                    f = feedparser.parse(src["url"])
-                    for e in f.entries[:10]: e['src_name'] = src['name']; entries.append(e)
-            entries.sort(key=lambda x: getattr(x, 'published_parsed', datetime.now().timetuple()), reverse=True)
-            self.root.after(0, lambda: self.update_data(entries))
-        threading.Thread(target=task, daemon=True).start()
-
-    def update_data(self, entries):
-        if self.all_entries and any(e.link not in [oe.link for oe in self.all_entries] for e in entries): self.play_ping()
-        self.all_entries = entries; self.refresh_display()
-        self.status_lbl.config(text=f"SYNC: {datetime.now().strftime('%H:%M:%S')}"); self.root.after(900000, self.fetch_data)
+        self._sync = {"pending": set(names), "total": len(names), "started": time.perf_counter()}
+
+    def merge_source(self, name, entries, error=None):
+        # One source has settled: its items go into the list now instead of waiting for the slowest source.
+        # entries=None without an error is a daemon poll that found nothing new.
+        if error is None and entries is not None: self.merge_results({name: entries})
+        if self.source_errors.get(name) != error:
+            if error: self.source_errors[name] = error
+            else: self.source_errors.pop(name, None)
+            self.render_source_btns()
+        if self._sync and name in self._sync["pending"]:
+            self._sync["pending"].discard(name)
+            if self._sync["pending"]:
+                self.status_lbl.config(text=f"HUB_SYNCING... {self._sync['total'] - len(self._sync['pending'])}/{self._sync['total']}"); return
+            self._sync = None
+        self.show_sync_status()
+
+    def update_data(self, results, errors=None):
+        self.merge_results(results)
+        self.source_errors = dict(errors or {}); self.render_source_btns(); self.show_sync_status()
+
+    def merge_results(self, results):
+        had_entries = len(self.store) > 0
+        with self.metrics.timer("store.merge"): delta = self.store.merge(results)
+        # Only a headline that starts a new story pings; another source carrying the same story stays quiet
+        fresh = self.clusterer.update(delta.added + delta.updated, delta.removed + delta.updated)
+        added, now = {e.link for e in delta.added}, time.monotonic()
+        if had_entries and any(e.link in added for e in fresh) and (self._last_ping is None or (now - self._last_ping) * 1000 >= PING_COOLDOWN_MS):
+            self._last_ping = now; self.play_ping()
+        if self.daemon is None: self.archive.add(delta.added + delta.updated)  # the daemon archives what it publishes
+        self.schedule_clustering()
+        if any(delta):
+            self.all_entries = self.store.entries(); self.search_index.update(self.all_entries, delta.updated); self.schedule_render()
+        return delta
+
+    def schedule_clustering(self):
+        # A large merge (first load, snapshot) leaves a backlog; it is worked off in idle-time passes without pinging
+        if self.clusterer.backlog and self._cluster_job is None: self._cluster_job = self.root.after_idle(self._drain_clusters)
+
+    def _drain_clusters(self):
+        self._cluster_job = None
+        version = self.clusterer.version; self.clusterer.update()
+        if self.clusterer.version != version: self.schedule_render()  # a pass that only added singletons changes no card
+        self.schedule_clustering()
+
+    def schedule_render(self):
+        # Sources landing in the same event-loop turn share one filter/bind pass
+        if self._render_job is None: self._render_job = self.root.after_idle(self._flush_render)
+
+    def _flush_render(self):
+        self._render_job = None; self.refresh_display()
+        if self._sync and self._sync.get("started") and self.news_list.rows:
+            self.metrics.observe("fetch.first_visible", (time.perf_counter() - self._sync.pop("started")) * 1000)
+
+    def show_sync_status(self):
+        err = f" // {len(self.source_errors)} ERR: {', '.join(f'{n} {m}' for n, m in self.source_errors.items())}" if self.source_errors else ""
+        self.status_lbl.config(text=f"SYNC: {datetime.now().strftime('%H:%M:%S')}{err}")
+
+    def on_search_changed(self, *args):
+        # Debounced: typing a word triggers one filter pass instead of one per keystroke
+        if self._search_job: self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self): self._search_job = None; self.refresh_display()
 
     def refresh_display(self):
-        for w in self.scrollable_frame.winfo_children(): w.destroy()
-        q = self.search_query.get().lower(); accent = THEMES[self.theme_idx]["accent"]
-        filtered = [e for e in self.all_entries if q in e.title.lower() and self.active_sources.get(e['src_name'], True)]
-        filtered.sort(key=lambda x: x.link in self.pinned_links, reverse=True)
-        for i, entry in enumerate(filtered): self.create_card(entry, i, accent)
-        if not filtered: tk.Label(self.scrollable_frame, text="NO DATA", fg=CORE_THEME["text_dim"], bg=CORE_THEME["bg_main"], pady=20).pack()
-
-    def create_card(self, entry, index, accent):
-        is_read = entry.link in self.read_links; is_pinned = entry.link in self.pinned_links; color = CORE_THEME["text_dim"] if is_read else CORE_THEME["text_main"]
-        card_border = tk.Frame(self.scrollable_frame, bg=accent if is_pinned else CORE_THEME["border"], padx=1, pady=1)
-        card_border.pack(fill="x", pady=4, padx=5); card = tk.Frame(card_border, bg=CORE_THEME["bg_card"], padx=10, pady=8, cursor="hand2"); card.pack(fill="x")
-        row = tk.Frame(card, bg=CORE_THEME["bg_card"]); row.pack(fill="x")
-        tk.Label(row, text=f" {entry['src_name']} ", fg=CORE_THEME["bg_main"], bg=accent, font=("Meiryo UI", 7, "bold")).pack(side="left")
-        star = tk.Label(row, text="★" if is_pinned else "☆", fg=accent if is_pinned else CORE_THEME["text_dim"], bg=CORE_THEME["bg_card"], cursor="hand2"); star.pack(side="right")
-        star.bind("<Button-1>", lambda e, l=entry.link: self.toggle_pin(l))
-        title = tk.Label(card, text=entry.title, fg=color, bg=CORE_THEME["bg_card"], font=("Meiryo UI", 10, "bold"), anchor="w", justify="left", wraplength=380); title.pack(fill="x", pady=(5, 0))
-        summ = re.sub('<[^<]+?>', '', getattr(entry, 'summary', ""))[:100] + "..."
-        def on_e(e, b=card_border, c=card, t=title, oc=color, s=summ):
-            if not self.overlay_mode: b.config(bg=accent); c.config(bg=CORE_THEME["bg_card_hover"])
-            t.config(fg=accent); self.status_lbl.config(text=f"PREVIEW: {s}", fg=CORE_THEME["text_main"])
-        def on_l(e, b=card_border, c=card, t=title, oc=color):
-            if not self.overlay_mode: b.config(bg=accent if is_pinned else CORE_THEME["border"]); c.config(bg=CORE_THEME["bg_card"])
-            t.config(fg=oc); self.status_lbl.config(text=f"SYNC: {datetime.now().strftime('%H:%M')}", fg=CORE_THEME["text_dim"])
-        for w in [card, title]:
-            w.bind("<Enter>", on_e); w.bind("<Leave>", on_l); w.bind("<Button-1>", lambda e, l=entry.link: self.open_link(l))
-        card.bind("<Button-3>", lambda e, t=entry.title: self.show_ai_summary(t))
+        with self.metrics.timer("render.refresh_display"):
+            if self.archive_mode: rows = archive_entries(self.archive, self.search_query.get(), self.active_sources, self.pinned_links)
+            else: rows = visible_entries(self.search_index, self.search_query.get(), self.active_sources, self.pinned_links, self.clusterer, self.expanded, self.store.sources_of)
+            self.news_list.set_rows(rows)
+
+    def create_card(self):
+        with self.metrics.timer("render.create_card"): return self._create_card()
+
+    def _create_card(self):
+        # Builds one recyclable card; handlers read slot.entry at event time instead of closing over an entry
+        slot = CardSlot()
+        slot.border = tk.Frame(self.canvas, bg=CORE_THEME["border"], padx=1, pady=1)
+        slot.card = tk.Frame(slot.border, bg=CORE_THEME["bg_card"], padx=10, pady=8, cursor="hand2"); slot.card.pack(fill="both", expand=True)
+        row = tk.Frame(slot.card, bg=CORE_THEME["bg_card"]); row.pack(fill="x")
+        slot.src = tk.Label(row, fg=CORE_THEME["bg_main"], font=("Meiryo UI", 7, "bold")); slot.src.pack(side="left")
+        slot.star = tk.Label(row, bg=CORE_THEME["bg_card"], cursor="hand2"); slot.star.pack(side="right")
+        slot.star.bind("<Button-1>", lambda e: slot.entry is not None and self.toggle_pin(slot.entry.link))
+        slot.count = tk.Label(row, bg=CORE_THEME["bg_card"], font=("Consolas", 8), cursor="hand2"); slot.count.pack(side="right", padx=(0, 6))
+        slot.count.bind("<Button-1>", lambda e: slot.entry is not None and self.toggle_story(slot.entry.link))
+        slot.title = tk.Label(slot.card, bg=CORE_THEME["bg_card"], font=("Meiryo UI", 10, "bold"), anchor="nw", justify="left", wraplength=380, height=2); slot.title.pack(fill="x", pady=(5, 0))
+        def on_e(e):
+            if slot.entry is None: return
+            accent = THEMES[self.theme_idx]["accent"]; summ = slot.state[0].summary
+            if not self.overlay_mode: slot.border.config(bg=accent); slot.card.config(bg=CORE_THEME["bg_card_hover"])
+            slot.title.config(fg=accent); self.status_lbl.config(text=f"PREVIEW: {summ}", fg=CORE_THEME["text_main"])
+        def on_l(e):
+            if slot.entry is None: return
+            self.bind_card(slot, slot.state); self.status_lbl.config(text=f"SYNC: {datetime.now().strftime('%H:%M')}", fg=CORE_THEME["text_dim"])
+        for w in [slot.card, slot.title]:
+            w.bind("<Enter>", on_e); w.bind("<Leave>", on_l); w.bind("<Button-1>", lambda e: slot.entry is not None and self.open_link(slot.entry.link))
+        slot.card.bind("<Button-3>", lambda e: slot.entry is not None and self.show_ai_summary(slot.entry.title))
+        return slot
+
+    def card_state(self, entry):
+        sid, copies = getattr(self.news_list.rows, "heads", {}).get(entry.link, (None, 0))
+        return card_model(entry, self.pinned_links, self.read_links, copies, sid in self.expanded), THEMES[self.theme_idx]["accent"]
+
+    def bind_card(self, slot, state, old=None):
+        # old=None repaints everything (also undoes hover styling); otherwise only the widgets whose inputs changed
+        (m, accent), (o, old_accent) = state, old or (None, None)
+        if o is None: slot.card.config(bg=CORE_THEME["bg_card"])
+        if o is None or (m.pinned, accent) != (o.pinned, old_accent):
+            slot.border.config(bg=accent if m.pinned else CORE_THEME["border"])
+            slot.star.config(text="★" if m.pinned else "☆", fg=accent if m.pinned else CORE_THEME["text_dim"])
+        if o is None or (m.source, accent) != (o.source, old_accent): slot.src.config(text=f" {m.source} ", bg=accent)
+        if o is None or (m.copies, m.expanded) != (o.copies, o.expanded):
+            slot.count.config(text=f"{'▼' if m.expanded else '▶'} +{m.copies}" if m.copies else "", fg=CORE_THEME["text_dim"])
+        if o is None or (m.title, m.read) != (o.title, o.read): slot.title.config(text=m.title, fg=CORE_THEME["text_dim"] if m.read else CORE_THEME["text_main"])
 
     def show_ai_summary(self, title):
         self.status_lbl.config(text="AI ANALYZING...", fg=THEMES[self.theme_idx]["accent"])
@@ -434,15 +833,27 @@ class CyberNewsWidget:
             self.status_lbl.config(text="HUB_READY", fg=CORE_THEME["text_dim"])
         self.root.after(1000, post)
 
-    def open_link(self, link): self.read_links.add(link); webbing = webbrowser.open(link); self.refresh_display(); self.save_settings()
+    def open_link(self, link): self.read_links.add(link); webbing = webbrowser.open(link); self.news_list.update(link); self.save_settings()
     def toggle_pin(self, link):
-        if link in self.pinned_links: self.pinned_links.remove(link)
-        else: self.pinned_links.add(link)
-        self.refresh_display(); self.save_settings()
+        pinned = link not in self.pinned_links
+        if pinned: self.pinned_links.add(link)
+        else: self.pinned_links.remove(link)
+        # Pinned cards sort first, so the entry moves within the current rows instead of a refilter
+        slot = self.news_list.by_link.get(link)
+        if slot is not None and self.news_list.rows.set_pinned(slot.entry, pinned): self.news_list.set_rows(self.news_list.rows)
+        else: self.news_list.update(link)
+        self.save_settings()
+
+    def toggle_story(self, link):
+        # Shows or hides the other sources' cards for the story this card leads
+        head = self.news_list.rows.heads.get(link) if hasattr(self.news_list.rows, "heads") else None
+        if head is None: return
+        self.expanded ^= {head[0]}; self.refresh_display()
 
     def toggle_mini(self, event):
         if not self.is_mini: self.body_frame.pack_forget(); self.root.geometry(f"{self.root.winfo_width()}x40"); self.is_mini = True
         else: self.body_frame.pack(fill="both", expand=True); self.root.geometry(f"{self.root.winfo_width()}x{self.current_h}"); self.is_mini = False
+        self.update_schedule_mode()
 
     def start_move(self, event): self.x, self.y = event.x, event.y
     def do_move(self, event): self.root.geometry(f"+{self.root.winfo_x()+(event.x-self.x)}+{self.root.winfo_y()+(event.y-self.y)}")
@@ -453,7 +864,9 @@ class CyberNewsWidget:
         else: self.root.geometry(f"{nw}x40")
 
     def on_window_resize(self, event):
-        if hasattr(self, 'canvas'): self.canvas.itemconfig(self.scroll_window, width=self.root.winfo_width()-25)
+        if hasattr(self, 'news_list'): self.news_list.set_width(self.root.winfo_width()-25)
 
 if __name__ == "__main__":
-    root = tk.Tk(); app = CyberNewsWidget(root); root.mainloop()
+    root = tk.Tk()
+    app = CyberNewsWidget(root, warm_start="--cold" not in sys.argv, daemon_address=None if "--standalone" in sys.argv else default_address())
+    root.mainloop()